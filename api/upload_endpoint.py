@@ -4,21 +4,28 @@ FastAPI upload endpoint for file processing
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-import tempfile
-import shutil
 
+import aiofiles
+import aiofiles.tempfile
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from config import Config
 from ingestion.pdf_loader import PDFLoader
 from ingestion.email_loader import EmailLoader
 from embeddings.embedder import Embedder
+from embeddings.http import close_http_client
 from storage.vector_store import VectorStore
 from storage.metadata_store import MetadataStore
+from storage.pool import get_pool, close_pools
+from storage.schemas import SearchResult
 from tasks.job_runner import JobRunner
 
 logger = logging.getLogger(__name__)
@@ -27,7 +34,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="gabo API",
     description="AI-native platform for unified data processing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -46,6 +54,20 @@ vector_store = None
 metadata_store = None
 job_runner = None
 
+# Per-worker directory for staged uploads, created once at startup
+upload_dir: Optional[Path] = None
+
+# Time (monotonic) and result of the last deep health check
+_last_health_check: Tuple[float, Optional["HealthResponse"]] = (0.0, None)
+
+# Uploads are streamed to disk in 1 MiB chunks
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.eml', '.msg', '.txt', '.docx'})
+
+# Deep health checks hit the database and embedding API, so their result is reused
+HEALTH_CHECK_TTL = 60.0
+
 
 class UploadResponse(BaseModel):
     """Response model for file upload"""
@@ -65,7 +87,7 @@ class SearchRequest(BaseModel):
 class SearchResponse(BaseModel):
     """Response model for search"""
     query: str
-    results: List[Dict[str, Any]]
+    results: List[SearchResult]
     total_results: int
     search_time_ms: float
 
@@ -77,19 +99,66 @@ class HealthResponse(BaseModel):
     components: Dict[str, str]
 
 
+def _extension(filename: Optional[str]) -> str:
+    """Return the lower-cased extension of a filename, including the dot"""
+    filename = filename or ""
+    dot = filename.rfind('.')
+    return filename[dot:].lower() if dot >= 0 else ''
+
+
+def _validate(file_ext: str) -> Optional[str]:
+    """Return an error message if the file extension is not supported"""
+    if file_ext not in ALLOWED_EXTENSIONS:
+        return f"Unsupported file type: {file_ext}"
+    return None
+
+
+async def _save_upload(file: UploadFile, suffix: str) -> str:
+    """Stream an uploaded file to a temporary file without blocking the event loop"""
+    try:
+        async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix=suffix,
+                                                        dir=upload_dir) as temp_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await temp_file.write(chunk)
+            return temp_file.name
+    finally:
+        await file.close()
+
+
+def _submit(filename: str, temp_path: str, file_ext: str) -> Dict[str, Any]:
+    """Submit a staged upload for processing
+    
+    Returns the raw UploadResponse fields; the endpoint's response_model
+    validates them once on the way out.
+    """
+    task = job_runner.process_document(temp_path, file_ext[1:])
+    return {
+        "filename": filename,
+        "status": "processing",
+        "message": "File uploaded and processing started",
+        "task_id": task.id
+    }
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
-    global config, embedder, vector_store, metadata_store, job_runner
+    global config, embedder, vector_store, metadata_store, job_runner, upload_dir
     
     try:
         # Load configuration
         config = Config.from_env()
         
+        # Stage uploads in a directory owned by this worker process
+        upload_dir = Path(config.storage.temp_dir) / f"w{os.getpid()}"
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        
         # Initialize components
         embedder = Embedder(config)
-        vector_store = VectorStore(config)
-        metadata_store = MetadataStore(config)
+        # Create the shared pool now rather than on the first request
+        pool = await get_pool(config)
+        vector_store = VectorStore(config, pool)
+        metadata_store = MetadataStore(config, pool)
         job_runner = JobRunner(config)
         
         # Initialize storage
@@ -111,6 +180,10 @@ async def shutdown_event():
             await vector_store.close()
         if metadata_store:
             await metadata_store.close()
+        await close_pools()
+        if embedder:
+            await embedder.close()
+        await close_http_client()
         logger.info("API shutdown completed")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -126,9 +199,30 @@ async def root():
     }
 
 
+@app.get("/livez")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"ok": True}
+
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness probe: components are initialized, without any network I/O"""
+    ready = all(component is not None for component in (embedder, vector_store, metadata_store, job_runner))
+    if not ready or vector_store.pool is None:
+        raise HTTPException(status_code=503, detail="Not ready")
+    return {"ok": True}
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (deep checks run at most once per HEALTH_CHECK_TTL)"""
+    global _last_health_check
+    
+    checked_at, cached = _last_health_check
+    if cached is not None and time.monotonic() - checked_at < HEALTH_CHECK_TTL:
+        return cached
+    
     try:
         # Check database connections
         db_status = "healthy"
@@ -137,16 +231,16 @@ async def health_check():
         except Exception:
             db_status = "unhealthy"
         
-        # Check embedding service
+        # Check embedding service; the cache would answer a repeated text itself
         embedding_status = "healthy"
         try:
-            await embedder.embed_text("test")
+            await embedder.check_provider()
         except Exception:
             embedding_status = "unhealthy"
         
-        return HealthResponse(
+        response = HealthResponse(
             status="healthy" if db_status == "healthy" and embedding_status == "healthy" else "unhealthy",
-            timestamp=asyncio.get_event_loop().time(),
+            timestamp=datetime.now(timezone.utc).isoformat(),
             components={
                 "database": db_status,
                 "embeddings": embedding_status,
@@ -154,6 +248,8 @@ async def health_check():
                 "metadata_store": "healthy"
             }
         )
+        _last_health_check = (time.monotonic(), response)
+        return response
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=500, detail="Health check failed")
@@ -167,29 +263,20 @@ async def upload_file(
     """Upload and process a file"""
     try:
         # Validate file type
-        allowed_extensions = ['.pdf', '.eml', '.msg', '.txt', '.docx']
-        file_ext = Path(file.filename).suffix.lower()
+        file_ext = _extension(file.filename)
+        error = _validate(file_ext)
         
-        if file_ext not in allowed_extensions:
+        if error:
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file type: {file_ext}. Supported types: {allowed_extensions}"
+                detail=f"{error}. Supported types: {sorted(ALLOWED_EXTENSIONS)}"
             )
         
         # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-            temp_path = temp_file.name
+        temp_path = await _save_upload(file, file_ext)
         
         # Submit processing task
-        task = job_runner.process_document(temp_path, file_ext[1:])
-        
-        return UploadResponse(
-            filename=file.filename,
-            status="processing",
-            message="File uploaded and processing started",
-            task_id=task.id
-        )
+        return _submit(file.filename, temp_path, file_ext)
         
     except Exception as e:
         logger.error(f"Error uploading file: {e}")
@@ -204,35 +291,34 @@ async def upload_files(
     """Upload and process multiple files"""
     try:
         responses = []
+        accepted = []
         
         for file in files:
             # Validate file type
-            allowed_extensions = ['.pdf', '.eml', '.msg', '.txt', '.docx']
-            file_ext = Path(file.filename).suffix.lower()
+            file_ext = _extension(file.filename)
+            error = _validate(file_ext)
             
-            if file_ext not in allowed_extensions:
-                responses.append(UploadResponse(
-                    filename=file.filename,
-                    status="error",
-                    message=f"Unsupported file type: {file_ext}",
-                    task_id=None
-                ))
+            if error:
+                responses.append({
+                    "filename": file.filename,
+                    "status": "error",
+                    "message": error,
+                    "task_id": None
+                })
                 continue
             
-            # Save uploaded file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-                shutil.copyfileobj(file.file, temp_file)
-                temp_path = temp_file.name
-            
-            # Submit processing task
-            task = job_runner.process_document(temp_path, file_ext[1:])
-            
-            responses.append(UploadResponse(
-                filename=file.filename,
-                status="processing",
-                message="File uploaded and processing started",
-                task_id=task.id
-            ))
+            # Reserve the response slot to keep results in upload order
+            accepted.append((len(responses), file, file_ext))
+            responses.append(None)
+        
+        # Save uploaded files concurrently
+        temp_paths = await asyncio.gather(*[
+            _save_upload(file, file_ext) for _, file, file_ext in accepted
+        ])
+        
+        # Submit processing tasks
+        for (index, file, file_ext), temp_path in zip(accepted, temp_paths):
+            responses[index] = _submit(file.filename, temp_path, file_ext)
         
         return responses
         
@@ -245,8 +331,7 @@ async def upload_files(
 async def search_documents(request: SearchRequest):
     """Search documents with natural language query"""
     try:
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Generate query embedding
         query_embedding = await embedder.embed_query(request.query)
@@ -258,11 +343,12 @@ async def search_documents(request: SearchRequest):
             similarity_threshold=request.similarity_threshold
         )
         
-        search_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        search_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
         
-        return SearchResponse(
+        # Results are already validated SearchResult models
+        return SearchResponse.model_construct(
             query=request.query,
-            results=[result.dict() for result in results],
+            results=results,
             total_results=len(results),
             search_time_ms=search_time
         )
@@ -283,6 +369,17 @@ async def get_task_status(task_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/task/group/{group_id}")
+async def get_group_status(group_id: str):
+    """Get status of every task of a batch processing group"""
+    try:
+        status = job_runner.get_group_status(group_id)
+        return status
+    except Exception as e:
+        logger.error(f"Error getting group status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/stats")
 async def get_stats():
     """Get system statistics"""
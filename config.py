@@ -2,12 +2,16 @@
 Configuration management for gabo platform
 """
 
+import copy
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 import yaml
 
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+
 
 @dataclass
 class DatabaseConfig:
@@ -19,6 +23,13 @@ class DatabaseConfig:
     password: str = ""
     vector_table: str = "embeddings"
     metadata_table: str = "metadata"
+    pool_min_size: int = 4
+    pool_max_size: int = 16
+    vector_index: str = "hnsw"  # hnsw, ivfflat (less memory on very large tables)
+    hnsw_ef_search: int = 40  # HNSW candidate list size per query (recall vs latency)
+    vector_index_precision: str = "float32"  # float32, float16 (halfvec index, half the size; pgvector >= 0.7)
+    bulk_store_tune: bool = False  # Measure bulk write batch sizes on first bulk store
+    bulk_synchronous_commit: bool = True  # False: bulk writes skip the WAL flush wait (backfills)
 
 
 @dataclass
@@ -29,6 +40,10 @@ class EmbeddingConfig:
     api_key: str = ""
     batch_size: int = 100
     max_retries: int = 3
+    concurrency: int = 8  # batch requests in flight at once
+    dtype: str = "float32"  # float32, float16 (embedding cache)
+    cache_size: int = 4096  # in-memory LRU entries
+    cache_path: str = ""  # SQLite file for a persistent cache, empty to disable
 
 
 @dataclass
@@ -46,6 +61,8 @@ class StorageConfig:
     """Storage and file handling configuration"""
     data_dir: str = "./data"
     temp_dir: str = "./temp"
+    chunk_cache_dir: str = ""  # cache of chunked documents, empty to disable
+    chunk_hash: bool = False  # store a content hash in chunk metadata
     max_file_size: int = 100 * 1024 * 1024  # 100MB
     supported_formats: list = None
     
@@ -57,15 +74,17 @@ class StorageConfig:
 @dataclass
 class TaskConfig:
     """Async task configuration"""
-    broker_url: str = "redis://localhost:6379/0"
-    result_backend: str = "redis://localhost:6379/0"
-    task_serializer: str = "json"
-    result_serializer: str = "json"
+    broker_url: str = DEFAULT_REDIS_URL
+    result_backend: str = DEFAULT_REDIS_URL
+    task_serializer: str = "orjson"  # orjson (registered by tasks.job_runner), json
+    result_serializer: str = "orjson"
     accept_content: list = None
+    task_compression: Optional[str] = None  # e.g. zstd (needs zstandard), gzip, zlib
     
     def __post_init__(self):
         if self.accept_content is None:
-            self.accept_content = ["json"]
+            # json too, so messages published before a serializer change still load
+            self.accept_content = ["orjson", "json"]
 
 
 @dataclass
@@ -93,7 +112,20 @@ class Config:
     
     @classmethod
     def from_env(cls) -> 'Config':
-        """Create configuration from environment variables"""
+        """Create configuration from environment variables
+        
+        The environment is read once per process; each call returns its own
+        copy, so changing one caller's config doesn't change the others'.
+        Call ``Config._from_env.cache_clear()`` to re-read the environment.
+        """
+        return copy.deepcopy(cls._from_env())
+    
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _from_env(cls) -> 'Config':
+        """Build the configuration from environment variables"""
+        broker_url = os.getenv("TASK_BROKER_URL", DEFAULT_REDIS_URL)
+        
         return cls(
             database=DatabaseConfig(
                 host=os.getenv("DB_HOST", "localhost"),
@@ -102,14 +134,25 @@ class Config:
                 username=os.getenv("DB_USER", "gabo_user"),
                 password=os.getenv("DB_PASSWORD", ""),
                 vector_table=os.getenv("DB_VECTOR_TABLE", "embeddings"),
-                metadata_table=os.getenv("DB_METADATA_TABLE", "metadata")
+                metadata_table=os.getenv("DB_METADATA_TABLE", "metadata"),
+                pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "4")),
+                pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "16")),
+                vector_index=os.getenv("DB_VECTOR_INDEX", "hnsw"),
+                hnsw_ef_search=int(os.getenv("DB_HNSW_EF_SEARCH", "40")),
+                vector_index_precision=os.getenv("DB_VECTOR_INDEX_PRECISION", "float32"),
+                bulk_store_tune=os.getenv("DB_BULK_STORE_TUNE", "false").lower() == "true",
+                bulk_synchronous_commit=os.getenv("DB_BULK_SYNCHRONOUS_COMMIT", "true").lower() == "true"
             ),
             embedding=EmbeddingConfig(
                 provider=os.getenv("EMBEDDING_PROVIDER", "openai"),
                 model=os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002"),
                 api_key=os.getenv("EMBEDDING_API_KEY", ""),
                 batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "100")),
-                max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+                max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", "3")),
+                concurrency=int(os.getenv("EMBEDDING_CONCURRENCY", "8")),
+                dtype=os.getenv("EMBEDDING_DTYPE", "float32"),
+                cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+                cache_path=os.getenv("EMBEDDING_CACHE_PATH", "")
             ),
             llm=LLMConfig(
                 provider=os.getenv("LLM_PROVIDER", "openai"),
@@ -121,11 +164,14 @@ class Config:
             storage=StorageConfig(
                 data_dir=os.getenv("STORAGE_DATA_DIR", "./data"),
                 temp_dir=os.getenv("STORAGE_TEMP_DIR", "./temp"),
+                chunk_cache_dir=os.getenv("STORAGE_CHUNK_CACHE_DIR", ""),
+                chunk_hash=os.getenv("STORAGE_CHUNK_HASH", "false").lower() == "true",
                 max_file_size=int(os.getenv("STORAGE_MAX_FILE_SIZE", str(100 * 1024 * 1024)))
             ),
             task=TaskConfig(
-                broker_url=os.getenv("TASK_BROKER_URL", "redis://localhost:6379/0"),
-                result_backend=os.getenv("TASK_RESULT_BACKEND", "redis://localhost:6379/0")
+                broker_url=broker_url,
+                result_backend=os.getenv("TASK_RESULT_BACKEND", broker_url),
+                task_compression=os.getenv("TASK_COMPRESSION") or None
             ),
             api=APIConfig(
                 host=os.getenv("API_HOST", "0.0.0.0"),
@@ -185,5 +231,8 @@ class Config:
         return True
 
 
-# Default configuration
-DEFAULT_CONFIG = Config.from_env() 
\ No newline at end of file
+def __getattr__(name: str) -> Any:
+    """Build DEFAULT_CONFIG on first access instead of at import time"""
+    if name == "DEFAULT_CONFIG":
+        return Config.from_env()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
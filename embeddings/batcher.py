@@ -0,0 +1,81 @@
+"""
+Micro-batching of concurrent single-item embedding calls
+"""
+
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into one batched provider call"""
+
+    def __init__(self, batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 100, max_delay: float = 0.01):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result from the next batch"""
+        loop = asyncio.get_running_loop()
+
+        # The collector is bound to the loop it was started on
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def close(self):
+        """Stop collecting and wait for in-flight batches to finish"""
+        if self._collector is not None and not self._collector.done():
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+        self._collector = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _collect(self):
+        """Gather queued items for up to max_delay and dispatch them as one batch"""
+        queue = self._queue
+        while True:
+            pending = [await queue.get()]
+
+            if queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_delay)
+            while len(pending) < self.max_batch_size and not queue.empty():
+                pending.append(queue.get_nowait())
+
+            # Flush without blocking collection of the next batch
+            task = asyncio.get_running_loop().create_task(self._flush(pending))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _flush(self, pending: List[Tuple[Any, asyncio.Future]]):
+        """Run the batched call and resolve each caller's future"""
+        try:
+            results = await self.batch_fn([item for item, _ in pending])
+        except Exception as e:
+            logger.error(f"Error in batched call of {len(pending)} items: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
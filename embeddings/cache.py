@@ -0,0 +1,119 @@
+"""
+Embedding cache keyed by provider, model and content hash
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+import hashlib
+import logging
+import sqlite3
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+_SQLITE_MAX_PARAMS = 500
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-memory LRU backed by an optional SQLite file"""
+
+    def __init__(self, provider: str, model: str, max_size: int = 4096, path: str = "",
+                 dtype: str = "float32"):
+        self.dtype = np.dtype(dtype)
+        # Vectors of another dtype have a different byte layout, so they get their own keys
+        self.namespace = f"{provider}:{model}" if self.dtype == np.float32 else f"{provider}:{model}:{dtype}"
+        self.max_size = max_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL
+                )
+            """)
+            self._db.commit()
+
+    def key(self, text: str, kind: str = "document") -> str:
+        """Build the cache key for a text of the given kind (document or query)"""
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        return f"{self.namespace}:{kind}:{digest}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get a single cached embedding"""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Get cached embeddings, with None for every miss"""
+        results = [self._memory_get(key) for key in keys]
+
+        missing = [key for key, vector in zip(keys, results) if vector is None]
+        if missing and self._db is not None:
+            found = {}
+            try:
+                for i in range(0, len(missing), _SQLITE_MAX_PARAMS):
+                    batch = missing[i:i + _SQLITE_MAX_PARAMS]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                        batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=self.dtype)
+            except sqlite3.Error as e:
+                # e.g. locked by another process sharing the file; the keys not
+                # read yet are misses
+                logger.warning(f"Error reading embedding cache: {e}")
+
+            for i, key in enumerate(keys):
+                if results[i] is None and key in found:
+                    results[i] = found[key]
+                    self._memory_put(key, found[key])
+
+        return results
+
+    def put(self, key: str, vector: np.ndarray):
+        """Cache a single embedding"""
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]):
+        """Cache embeddings in memory and, if configured, on disk"""
+        if not items:
+            return
+
+        rows = []
+        for key, vector in items:
+            vector = np.asarray(vector, dtype=self.dtype)
+            self._memory_put(key, vector)
+            rows.append((key, vector.tobytes()))
+
+        if self._db is not None:
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error writing embedding cache: {e}")
+
+    def close(self):
+        """Close the on-disk cache"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _memory_get(self, key: str) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    def _memory_put(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
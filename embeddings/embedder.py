@@ -2,17 +2,25 @@
 Main embedder interface for gabo platform
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import asyncio
 import logging
+import numpy as np
 
 from config import Config
 from .models.openai_embed import OpenAIEmbedder
 from .models.cohere_embed import CohereEmbedder
 from .models.voyage_embed import VoyageEmbedder
+from .batcher import MicroBatcher
+from .cache import EmbeddingCache
+from .utils import log_and_reraise
 
 logger = logging.getLogger(__name__)
 
+# Exponential backoff for retried provider calls, in seconds
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
 
 class Embedder:
     """Main embedder class that manages different embedding providers"""
@@ -23,9 +31,24 @@ class Embedder:
         self.model = config.embedding.model
         self.batch_size = config.embedding.batch_size
         self.max_retries = config.embedding.max_retries
+        self.concurrency = max(1, config.embedding.concurrency)
+        self.dtype = np.dtype(config.embedding.dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported embedding dtype: {config.embedding.dtype}")
         
         # Initialize the appropriate embedder
         self._embedder = self._create_embedder()
+        self._cache = EmbeddingCache(
+            self.provider,
+            self.model,
+            max_size=config.embedding.cache_size,
+            path=config.embedding.cache_path,
+            dtype=config.embedding.dtype
+        )
+        
+        # Concurrent single-text calls are coalesced into batched requests
+        self._text_batcher = MicroBatcher(self._embed_batch, self.batch_size)
+        self._query_batcher = MicroBatcher(self._embed_query_batch, self.batch_size)
     
     def _create_embedder(self):
         """Create the appropriate embedder based on configuration"""
@@ -38,42 +61,113 @@ class Embedder:
         else:
             raise ValueError(f"Unsupported embedding provider: {self.provider}")
     
-    async def embed_text(self, text: str) -> List[float]:
+    @log_and_reraise("embedding text")
+    async def embed_text(self, text: str) -> np.ndarray:
         """Embed a single text string"""
-        try:
-            return await self._embedder.embed_text(text)
-        except Exception as e:
-            logger.error(f"Error embedding text: {e}")
-            raise
+        key = self._cache.key(text)
+        embedding = self._cache.get(key)
+        if embedding is None:
+            embedding = np.asarray(await self._text_batcher.submit(text), dtype=np.float32)
+            self._cache.put(key, embedding)
+        return np.asarray(embedding, dtype=np.float32)
     
-    async def embed_chunks(self, chunks: List[str]) -> List[List[float]]:
-        """Embed multiple text chunks in batches"""
-        try:
-            embeddings = []
-            
-            # Process in batches
-            for i in range(0, len(chunks), self.batch_size):
-                batch = chunks[i:i + self.batch_size]
-                batch_embeddings = await self._embedder.embed_batch(batch)
-                embeddings.extend(batch_embeddings)
-                
-                # Add small delay between batches to avoid rate limits
-                if i + self.batch_size < len(chunks):
-                    await asyncio.sleep(0.1)
-            
-            return embeddings
-            
-        except Exception as e:
-            logger.error(f"Error embedding chunks: {e}")
-            raise
+    @log_and_reraise("embedding chunks")
+    async def embed_chunks(self, chunks: List[str]) -> np.ndarray:
+        """Embed multiple text chunks in batches, returning an (N, D) float32 array"""
+        if not chunks:
+            return np.empty((0, self.get_embedding_dimension()), dtype=np.float32)
+        
+        # Only chunks missing from the cache are sent to the provider, and
+        # repeated chunks (signatures, boilerplate) only once
+        keys = [self._cache.key(chunk) for chunk in chunks]
+        cached = self._cache.get_many(keys)
+        first_miss: Dict[str, int] = {}
+        for i, embedding in enumerate(cached):
+            if embedding is None:
+                first_miss.setdefault(keys[i], i)
+        misses = list(first_miss.values())
+        
+        # Process in batches, with up to `concurrency` requests in flight
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run(batch: List[str]) -> np.ndarray:
+            async with semaphore:
+                return np.asarray(await self._embed_batch(batch), dtype=np.float32)
+        
+        batches = await asyncio.gather(*[
+            run([chunks[j] for j in misses[i:i + self.batch_size]])
+            for i in range(0, len(misses), self.batch_size)
+        ])
+        
+        fetched = np.concatenate(batches) if batches else None
+        dimension = fetched.shape[1] if fetched is not None else len(cached[0])
+        
+        embeddings = np.empty((len(chunks), dimension), dtype=np.float32)
+        for i, embedding in enumerate(cached):
+            if embedding is not None:
+                embeddings[i] = embedding
+        if fetched is not None:
+            self._cache.put_many([(keys[i], fetched[j]) for j, i in enumerate(misses)])
+            # Every missing chunk, repeats included, takes the row fetched for its key
+            row = {key: j for j, key in enumerate(first_miss)}
+            missing = [i for i, embedding in enumerate(cached) if embedding is None]
+            embeddings[missing] = fetched[[row[keys[i]] for i in missing]]
+        
+        return embeddings
     
-    async def embed_query(self, query: str) -> List[float]:
+    @log_and_reraise("embedding query")
+    async def embed_query(self, query: str) -> np.ndarray:
         """Embed a query for search (may use different model)"""
+        key = self._cache.key(query, kind="query")
+        embedding = self._cache.get(key)
+        if embedding is None:
+            embedding = np.asarray(await self._query_batcher.submit(query), dtype=np.float32)
+            self._cache.put(key, embedding)
+        return np.asarray(embedding, dtype=np.float32)
+    
+    async def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts, retrying rate-limited and transient failures"""
+        return await self._with_retries(self._embedder.embed_batch, texts)
+    
+    async def _embed_query_batch(self, queries: List[str]) -> np.ndarray:
+        """Embed a batch of queries, retrying rate-limited and transient failures"""
+        return await self._with_retries(self._embedder.embed_query_batch, queries)
+    
+    async def _with_retries(self, call, items: List[str]):
+        """Call the provider with exponential backoff, honoring Retry-After on 429"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await call(items)
+            except Exception as e:
+                status = getattr(e, "status_code", None) or getattr(e, "http_status", None)
+                retryable = status is None or status == 429 or status >= 500
+                if attempt >= self.max_retries or not retryable:
+                    raise
+                
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                logger.warning(f"Embedding request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds to wait from a Retry-After header on the provider error, if any"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or getattr(error, "headers", None)
+        if not headers:
+            return None
         try:
-            return await self._embedder.embed_query(query)
-        except Exception as e:
-            logger.error(f"Error embedding query: {e}")
-            raise
+            return min(RETRY_MAX_DELAY, float(headers.get("retry-after")))
+        except (TypeError, ValueError):
+            return None
+    
+    async def check_provider(self):
+        """Embed a probe text with the provider, bypassing the cache and retries
+        
+        For health checks; raises if the provider cannot be reached.
+        """
+        await self._embedder.embed_batch(["test"])
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings produced by this model"""
@@ -81,20 +175,19 @@ class Embedder:
     
     async def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """Calculate cosine similarity between two embeddings"""
-        try:
-            return self._embedder.similarity(embedding1, embedding2)
-        except Exception as e:
-            logger.error(f"Error calculating similarity: {e}")
-            raise
+        return self._embedder.similarity(embedding1, embedding2)
     
     async def batch_similarity(self, query_embedding: List[float], 
-                             embeddings: List[List[float]]) -> List[float]:
+                             embeddings: Union[List[List[float]], np.ndarray, bytes, memoryview],
+                             normalized: bool = False) -> List[float]:
         """Calculate similarities between query and multiple embeddings"""
-        try:
-            return self._embedder.batch_similarity(query_embedding, embeddings)
-        except Exception as e:
-            logger.error(f"Error calculating batch similarity: {e}")
-            raise
+        return self._embedder.batch_similarity(query_embedding, embeddings, normalized)
+    
+    async def close(self):
+        """Flush pending batched calls and close the embedding cache"""
+        await self._text_batcher.close()
+        await self._query_batcher.close()
+        self._cache.close()
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current embedding model"""
@@ -103,5 +196,6 @@ class Embedder:
             "model": self.model,
             "dimension": self.get_embedding_dimension(),
             "batch_size": self.batch_size,
-            "max_retries": self.max_retries
+            "max_retries": self.max_retries,
+            "concurrency": self.concurrency
         } 
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Shared HTTP client for embedding provider APIs
+"""
+
+from typing import Optional
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # installed with httpx[http2]
+    HTTP2_AVAILABLE = False
+
+# Sized for concurrent batch requests plus micro-batched single calls
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+HTTP_CONNECT_RETRIES = 3
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide client, so provider requests reuse warm connections"""
+    global _client
+    if _client is None or _client.is_closed:
+        # Connection failures are retried by the transport; HTTP errors are
+        # left to Embedder's backoff
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=HTTP_LIMITS,
+            retries=HTTP_CONNECT_RETRIES
+        )
+        _client = httpx.AsyncClient(transport=transport, timeout=HTTP_TIMEOUT)
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def reset_http_client():
+    """Forget the shared client without closing it, e.g. in a forked child
+    
+    Its connections, if any, belong to the parent process.
+    """
+    global _client
+    _client = None
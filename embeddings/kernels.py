@@ -0,0 +1,42 @@
+"""
+Compiled kernels for embedding math (optional, requires numba)
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # fall back to the NumPy implementations in utils
+    NUMBA_AVAILABLE = False
+
+# Below this many rows NumPy's BLAS call is already cheaper than a kernel launch
+KERNEL_MIN_ROWS = 32
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def cosine_batch(q: np.ndarray, M: np.ndarray, out: np.ndarray):
+        """Cosine similarity of q against every row of M, written into out
+
+        Row norms and dot products are accumulated in the same pass, so M is
+        read from memory once and never normalized into a copy.
+        """
+        D = q.shape[0]
+        N = M.shape[0]
+
+        qn = 0.0
+        for d in range(D):
+            qn += q[d] * q[d]
+        # Norms are floored like utils.MIN_NORM, so zero rows score 0, not NaN
+        qn = 1.0 / max(math.sqrt(qn), 1e-12)
+
+        for i in prange(N):
+            s = 0.0
+            n = 0.0
+            for d in range(D):
+                v = M[i, d]
+                s += v * q[d]
+                n += v * v
+            out[i] = s * qn / max(math.sqrt(n), 1e-12)
@@ -4,13 +4,11 @@ Cohere embedding implementation
 
 import asyncio
 import numpy as np
-from typing import List, Dict, Any
-import logging
+from typing import List, Dict, Any, Union
 import cohere
 
 from config import Config
-
-logger = logging.getLogger(__name__)
+from ..utils import cosine_similarity, dot_similarity, batch_cosine_similarity
 
 
 class CohereEmbedder:
@@ -20,6 +18,9 @@ class CohereEmbedder:
         self.config = config
         self.api_key = config.embedding.api_key
         self.model = config.embedding.model
+        
+        # Cohere embeddings are not guaranteed to be unit length
+        self._prenormalized = False
         self.client = cohere.AsyncClient(self.api_key)
         
         # Model dimension mapping
@@ -30,44 +31,41 @@ class CohereEmbedder:
             "embed-multilingual-light-v4.0": 384
         }
     
-    async def embed_text(self, text: str) -> List[float]:
+    async def embed_text(self, text: str) -> np.ndarray:
         """Embed a single text string"""
-        try:
-            response = await self.client.embed(
-                texts=[text],
-                model=self.model,
-                input_type="search_document"
-            )
-            return response.embeddings[0]
-        except Exception as e:
-            logger.error(f"Error embedding text with Cohere: {e}")
-            raise
+        response = await self.client.embed(
+            texts=[text],
+            model=self.model,
+            input_type="search_document"
+        )
+        return np.asarray(response.embeddings[0], dtype=np.float32)
     
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
         """Embed a batch of texts"""
-        try:
-            response = await self.client.embed(
-                texts=texts,
-                model=self.model,
-                input_type="search_document"
-            )
-            return response.embeddings
-        except Exception as e:
-            logger.error(f"Error embedding batch with Cohere: {e}")
-            raise
+        response = await self.client.embed(
+            texts=texts,
+            model=self.model,
+            input_type="search_document"
+        )
+        return np.asarray(response.embeddings, dtype=np.float32)
     
-    async def embed_query(self, query: str) -> List[float]:
+    async def embed_query(self, query: str) -> np.ndarray:
         """Embed a query with appropriate input type"""
-        try:
-            response = await self.client.embed(
-                texts=[query],
-                model=self.model,
-                input_type="search_query"
-            )
-            return response.embeddings[0]
-        except Exception as e:
-            logger.error(f"Error embedding query with Cohere: {e}")
-            raise
+        response = await self.client.embed(
+            texts=[query],
+            model=self.model,
+            input_type="search_query"
+        )
+        return np.asarray(response.embeddings[0], dtype=np.float32)
+    
+    async def embed_query_batch(self, queries: List[str]) -> np.ndarray:
+        """Embed a batch of queries with appropriate input type"""
+        response = await self.client.embed(
+            texts=queries,
+            model=self.model,
+            input_type="search_query"
+        )
+        return np.asarray(response.embeddings, dtype=np.float32)
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings produced by this model"""
@@ -75,39 +73,16 @@ class CohereEmbedder:
     
     def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """Calculate cosine similarity between two embeddings"""
-        try:
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
-            
-            # Normalize vectors
-            vec1_norm = vec1 / np.linalg.norm(vec1)
-            vec2_norm = vec2 / np.linalg.norm(vec2)
-            
-            # Calculate cosine similarity
-            similarity = np.dot(vec1_norm, vec2_norm)
-            return float(similarity)
-        except Exception as e:
-            logger.error(f"Error calculating similarity: {e}")
-            raise
+        if self._prenormalized:
+            return dot_similarity(embedding1, embedding2)
+        return cosine_similarity(embedding1, embedding2)
     
     def batch_similarity(self, query_embedding: List[float], 
-                        embeddings: List[List[float]]) -> List[float]:
+                        embeddings: Union[List[List[float]], np.ndarray, bytes, memoryview],
+                        normalized: bool = False) -> List[float]:
         """Calculate similarities between query and multiple embeddings"""
-        try:
-            query_vec = np.array(query_embedding)
-            query_norm = query_vec / np.linalg.norm(query_vec)
-            
-            similarities = []
-            for embedding in embeddings:
-                vec = np.array(embedding)
-                vec_norm = vec / np.linalg.norm(vec)
-                similarity = np.dot(query_norm, vec_norm)
-                similarities.append(float(similarity))
-            
-            return similarities
-        except Exception as e:
-            logger.error(f"Error calculating batch similarity: {e}")
-            raise
+        return batch_cosine_similarity(query_embedding, embeddings,
+                                       normalized or self._prenormalized)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the Cohere model"""
@@ -3,14 +3,15 @@ OpenAI embedding implementation
 """
 
 import asyncio
+import base64
+import json
 import numpy as np
-from typing import List, Dict, Any
-import logging
+from typing import List, Dict, Any, Union
 from openai import AsyncOpenAI
 
 from config import Config
-
-logger = logging.getLogger(__name__)
+from ..http import get_http_client
+from ..utils import cosine_similarity, dot_similarity, batch_cosine_similarity
 
 
 class OpenAIEmbedder:
@@ -20,7 +21,10 @@ class OpenAIEmbedder:
         self.config = config
         self.api_key = config.embedding.api_key
         self.model = config.embedding.model
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        
+        # OpenAI returns unit-length embeddings, so cosine similarity reduces to a dot product
+        self._prenormalized = True
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=get_http_client())
         
         # Model dimension mapping
         self.dimensions = {
@@ -29,73 +33,56 @@ class OpenAIEmbedder:
             "text-embedding-3-large": 3072
         }
     
-    async def embed_text(self, text: str) -> List[float]:
+    async def embed_text(self, text: str) -> np.ndarray:
         """Embed a single text string"""
-        try:
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"Error embedding text with OpenAI: {e}")
-            raise
+        return (await self._create([text]))[0]
     
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
         """Embed a batch of texts"""
-        try:
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=texts
-            )
-            return [data.embedding for data in response.data]
-        except Exception as e:
-            logger.error(f"Error embedding batch with OpenAI: {e}")
-            raise
+        return await self._create(texts)
     
-    async def embed_query(self, query: str) -> List[float]:
+    async def _create(self, texts: List[str]) -> np.ndarray:
+        """Request base64 embeddings and decode them straight into a float32 matrix
+        
+        The raw response is read directly, skipping the SDK's per-item models
+        and the float-by-float JSON parsing.
+        """
+        response = await self.client.embeddings.with_raw_response.create(
+            model=self.model,
+            input=texts,
+            encoding_format="base64"
+        )
+        data = json.loads(response.http_response.content)["data"]
+        data.sort(key=lambda item: item["index"])
+        return np.stack([
+            np.frombuffer(base64.b64decode(item["embedding"]), dtype=np.float32)
+            for item in data
+        ])
+    
+    async def embed_query(self, query: str) -> np.ndarray:
         """Embed a query (same as embed_text for OpenAI)"""
         return await self.embed_text(query)
     
+    async def embed_query_batch(self, queries: List[str]) -> np.ndarray:
+        """Embed a batch of queries (same as embed_batch for OpenAI)"""
+        return await self.embed_batch(queries)
+    
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings produced by this model"""
         return self.dimensions.get(self.model, 1536)
     
     def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """Calculate cosine similarity between two embeddings"""
-        try:
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
-            
-            # Normalize vectors
-            vec1_norm = vec1 / np.linalg.norm(vec1)
-            vec2_norm = vec2 / np.linalg.norm(vec2)
-            
-            # Calculate cosine similarity
-            similarity = np.dot(vec1_norm, vec2_norm)
-            return float(similarity)
-        except Exception as e:
-            logger.error(f"Error calculating similarity: {e}")
-            raise
+        if self._prenormalized:
+            return dot_similarity(embedding1, embedding2)
+        return cosine_similarity(embedding1, embedding2)
     
     def batch_similarity(self, query_embedding: List[float], 
-                        embeddings: List[List[float]]) -> List[float]:
+                        embeddings: Union[List[List[float]], np.ndarray, bytes, memoryview],
+                        normalized: bool = False) -> List[float]:
         """Calculate similarities between query and multiple embeddings"""
-        try:
-            query_vec = np.array(query_embedding)
-            query_norm = query_vec / np.linalg.norm(query_vec)
-            
-            similarities = []
-            for embedding in embeddings:
-                vec = np.array(embedding)
-                vec_norm = vec / np.linalg.norm(vec)
-                similarity = np.dot(query_norm, vec_norm)
-                similarities.append(float(similarity))
-            
-            return similarities
-        except Exception as e:
-            logger.error(f"Error calculating batch similarity: {e}")
-            raise
+        return batch_cosine_similarity(query_embedding, embeddings,
+                                       normalized or self._prenormalized)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the OpenAI model"""
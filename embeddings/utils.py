@@ -0,0 +1,176 @@
+"""
+Utility functions for embedding math
+"""
+
+from typing import List, Union
+import functools
+import logging
+import numpy as np
+
+from .kernels import NUMBA_AVAILABLE, KERNEL_MIN_ROWS
+
+if NUMBA_AVAILABLE:
+    from .kernels import cosine_batch
+
+Vector = Union[List[float], np.ndarray]
+# Raw buffers hold concatenated float32 rows, e.g. a blob read from storage
+Matrix = Union[List[List[float]], np.ndarray, bytes, bytearray, memoryview]
+
+# Floor for L2 norms, so all-zero embeddings normalize to zero instead of NaN
+MIN_NORM = 1e-12
+
+
+def as_matrix(matrix: Matrix, dimension: int) -> np.ndarray:
+    """
+    View embeddings as an (N, D) float32 array, without copying when possible
+
+    Args:
+        matrix: Embeddings as a list of vectors, an (N, D) array, or a raw
+            buffer of concatenated float32 rows
+        dimension: Embedding dimension D, used to shape raw buffers
+
+    Returns:
+        (N, D) float32 array; a zero-copy view for buffers and float32 arrays
+    """
+    if isinstance(matrix, (bytes, bytearray, memoryview)):
+        return np.frombuffer(matrix, dtype=np.float32).reshape(-1, dimension)
+    return np.asarray(matrix, dtype=np.float32).reshape(-1, dimension)
+
+
+def row_norms(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2 norm of each row, floored at MIN_NORM
+
+    The squares are summed by einsum, without the (N, D) temporary array
+    that ``np.linalg.norm(axis=1)`` allocates, about 3x faster on large
+    batches.
+
+    Args:
+        matrix: (N, D) float32 array
+
+    Returns:
+        (N,) float32 array of row norms
+    """
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    np.maximum(norms, MIN_NORM, out=norms)
+    return norms
+
+
+def normalize_rows(matrix: Matrix) -> np.ndarray:
+    """
+    Stack embeddings into a contiguous float32 matrix of unit-length rows
+
+    Args:
+        matrix: Embeddings as a list of vectors or an (N, D) array
+
+    Returns:
+        (N, D) float32 array with L2-normalized rows
+    """
+    M = np.array(matrix, dtype=np.float32, order="C", ndmin=2)
+    M /= row_norms(M)[:, None]
+    return M
+
+
+def normalize_vector(vector: Vector) -> np.ndarray:
+    """
+    Convert a single embedding to a unit-length float32 vector
+
+    Args:
+        vector: Embedding as a list or 1-D array
+
+    Returns:
+        1-D float32 array with unit L2 norm
+    """
+    q = np.array(vector, dtype=np.float32)
+    q /= max(np.sqrt(q @ q), MIN_NORM)
+    return q
+
+
+def cosine_similarity(embedding1: Vector, embedding2: Vector) -> float:
+    """
+    Calculate cosine similarity between two embeddings
+
+    Args:
+        embedding1: First embedding
+        embedding2: Second embedding
+
+    Returns:
+        Cosine similarity score
+    """
+    return float(np.dot(normalize_vector(embedding1), normalize_vector(embedding2)))
+
+
+def dot_similarity(embedding1: Vector, embedding2: Vector) -> float:
+    """
+    Cosine similarity between two embeddings already of unit length
+
+    Args:
+        embedding1: First unit-length embedding
+        embedding2: Second unit-length embedding
+
+    Returns:
+        Dot product, equal to the cosine similarity
+    """
+    return float(np.dot(np.asarray(embedding1, dtype=np.float32),
+                        np.asarray(embedding2, dtype=np.float32)))
+
+
+def batch_cosine_similarity(query_embedding: Vector, embeddings: Matrix,
+                            normalized: bool = False) -> List[float]:
+    """
+    Calculate cosine similarities between a query and many embeddings
+
+    All rows are scored with a single matrix-vector product instead of a
+    Python loop over the embeddings.
+
+    Args:
+        query_embedding: Query embedding
+        embeddings: Embeddings as a list of vectors, an (N, D) array, or a
+            raw buffer of concatenated float32 rows
+        normalized: True when ``embeddings`` is already a float32 matrix of
+            unit-length rows (e.g. a cached matrix), which skips normalization
+
+    Returns:
+        List of similarity scores, one per embedding
+    """
+    if len(embeddings) == 0:
+        return []
+
+    q = normalize_vector(query_embedding)
+    M = as_matrix(embeddings, len(q))
+
+    if not normalized and NUMBA_AVAILABLE and len(M) > KERNEL_MIN_ROWS:
+        # Fused normalize + dot, without materializing a normalized copy
+        out = np.empty(len(M), dtype=np.float32)
+        cosine_batch(q, np.ascontiguousarray(M), out)
+        return out.tolist()
+
+    if not normalized:
+        M = normalize_rows(M)
+
+    return (M @ q).tolist()
+
+
+def log_and_reraise(context: str):
+    """
+    Decorate an async API-boundary method to log failures before re-raising
+
+    Args:
+        context: What the method does, used in the log message
+
+    Returns:
+        Decorator that logs ``Error <context>: <exception>`` on the wrapped
+        method's module logger
+    """
+    def decorator(fn):
+        logger = logging.getLogger(fn.__module__)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error {context}: {e}")
+                raise
+        return wrapper
+    return decorator
@@ -5,7 +5,7 @@ Ingestion module for gabo platform
 from .base_loader import BaseLoader
 from .pdf_loader import PDFLoader
 from .email_loader import EmailLoader
-from .utils import chunk_text, clean_text, extract_metadata
+from .utils import chunk_text, clean_text, stream_clean_and_chunk, extract_metadata
 
 __all__ = [
     "BaseLoader",
@@ -13,5 +13,6 @@ __all__ = [
     "EmailLoader",
     "chunk_text",
     "clean_text",
+    "stream_clean_and_chunk",
     "extract_metadata"
 ] 
\ No newline at end of file
@@ -7,8 +7,10 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 import asyncio
 import logging
+from concurrent.futures import Executor
 
-from .utils import chunk_text, clean_text, extract_metadata
+from .cache import ChunkCache
+from .utils import stream_clean_and_chunk, extract_metadata
 from ..storage.schemas import DocumentChunk
 
 logger = logging.getLogger(__name__)
@@ -17,10 +19,15 @@ logger = logging.getLogger(__name__)
 class BaseLoader(ABC):
     """Abstract base class for document loaders"""
     
-    def __init__(self):
+    def __init__(self, executor: Optional[Executor] = None):
+        # Executor for CPU-bound parsing; None uses the event loop's default thread pool
+        self.executor = executor
         self.supported_extensions = []
         self.max_chunk_size = 1000
         self.chunk_overlap = 200
+        self.chunk_cache: Optional[ChunkCache] = None
+        # Store a content hash in each chunk's metadata (see StorageConfig.chunk_hash)
+        self.chunk_hash = False
     
     @abstractmethod
     async def load_document(self, file_path: str) -> Dict[str, Any]:
@@ -35,22 +42,34 @@ class BaseLoader(ABC):
     async def load_and_chunk(self, file_path: str) -> List[DocumentChunk]:
         """Load document and return chunked content"""
         try:
+            # Unchanged files with unchanged loader settings are served from the cache
+            cache_key = None
+            if self.chunk_cache is not None:
+                loop = asyncio.get_running_loop()
+                cache_key = await loop.run_in_executor(
+                    None, self.chunk_cache.key, file_path, self._cache_params()
+                )
+                cached = self.chunk_cache.get(cache_key, file_path)
+                if cached is not None:
+                    logger.info(f"Loaded {len(cached)} cached chunks for {file_path}")
+                    return cached
+            
             # Load the document
             content = await self.load_document(file_path)
             
             # Extract text
             text = self.extract_text(content)
             
-            # Clean text
-            cleaned_text = clean_text(text)
-            
-            # Chunk the text
-            chunks = chunk_text(cleaned_text, self.max_chunk_size, self.chunk_overlap)
+            # Clean, chunk and hash the text in one streaming pass
+            chunks = stream_clean_and_chunk(
+                text, self.max_chunk_size, self.chunk_overlap, with_hash=self.chunk_hash
+            )
             
             # Create DocumentChunk objects
             document_chunks = []
-            for i, chunk in enumerate(chunks):
-                metadata = extract_metadata(content, chunk, i)
+            for i, (chunk, chunk_hash) in enumerate(chunks):
+                metadata = extract_metadata(content, chunk, i, precomputed_hash=chunk_hash,
+                                            include_hash=self.chunk_hash)
                 document_chunk = DocumentChunk(
                     content=chunk,
                     metadata=metadata,
@@ -59,6 +78,9 @@ class BaseLoader(ABC):
                 )
                 document_chunks.append(document_chunk)
             
+            if cache_key is not None:
+                self.chunk_cache.put(cache_key, document_chunks)
+            
             logger.info(f"Created {len(document_chunks)} chunks from {file_path}")
             return document_chunks
             
@@ -66,6 +88,10 @@ class BaseLoader(ABC):
             logger.error(f"Error processing {file_path}: {e}")
             raise
     
+    def _cache_params(self) -> tuple:
+        """Loader settings that affect chunk output, part of the chunk cache key"""
+        return (self.__class__.__name__, self.max_chunk_size, self.chunk_overlap, self.chunk_hash)
+    
     def can_handle(self, file_path: str) -> bool:
         """Check if this loader can handle the given file"""
         ext = Path(file_path).suffix.lower()
@@ -0,0 +1,74 @@
+"""
+On-disk cache of chunked documents keyed by file content and loader parameters
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+if TYPE_CHECKING:
+    from ..storage.schemas import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+# Files are hashed in 1 MiB reads
+_READ_SIZE = 1 << 20
+
+# Bump when the chunking pipeline changes output for the same input
+CACHE_VERSION = 3
+
+
+class ChunkCache:
+    """Pickled load_and_chunk results, one file per (content, loader parameters) key"""
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def key(self, file_path: str, params: Tuple) -> str:
+        """Hash the file bytes together with the loader parameters"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((CACHE_VERSION, params)).encode())
+        with open(file_path, 'rb') as f:
+            while block := f.read(_READ_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def get(self, key: str, file_path: str) -> Optional[List["DocumentChunk"]]:
+        """Load cached chunks, their path fields re-pointed at the given file path"""
+        path = self.cache_dir / f"{key}.pkl"
+        try:
+            with open(path, 'rb') as f:
+                chunks = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable chunk cache entry {path}: {e}")
+            return None
+        
+        # Identical content may have been cached under another path, e.g. an
+        # upload's temporary file that no longer exists
+        for chunk in chunks:
+            chunk.source_file = file_path
+            source_metadata = chunk.metadata.get("source_metadata")
+            if isinstance(source_metadata, dict) and "file_path" in source_metadata:
+                source_metadata["file_path"] = file_path
+        return chunks
+    
+    def put(self, key: str, chunks: List["DocumentChunk"]):
+        """Write chunks atomically, so readers never see a partial entry"""
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self.cache_dir / f"{key}.pkl")
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Error writing chunk cache: {e}")
@@ -3,10 +3,11 @@ Email document loader for EML files
 """
 
 import asyncio
-from typing import Dict, Any, List
+from concurrent.futures import Executor
+from typing import Dict, Any, List, Optional
 from pathlib import Path
-import email
 from email import policy
+from email.parser import BytesParser
 import logging
 
 from .base_loader import BaseLoader
@@ -14,11 +15,101 @@ from .base_loader import BaseLoader
 logger = logging.getLogger(__name__)
 
 
+def _load_email_sync(file_path: str) -> Dict[str, Any]:
+    """Synchronous email loading, run in a worker process or thread"""
+    # Parse email straight from the binary stream
+    with open(file_path, 'rb') as f:
+        msg = BytesParser(policy=policy.default).parse(f)
+    
+    # Extract headers
+    headers = dict(msg.items())
+    
+    # Extract body
+    body = _extract_email_body(msg)
+    
+    # Extract attachments
+    attachments = _extract_attachments(msg)
+    
+    return {
+        "headers": headers,
+        "body": body,
+        "attachments": attachments,
+        "metadata": {
+            "subject": headers.get("Subject", ""),
+            "from": headers.get("From", ""),
+            "to": headers.get("To", ""),
+            "date": headers.get("Date", ""),
+            "message_id": headers.get("Message-ID", ""),
+            "file_path": file_path
+        }
+    }
+
+
+def _extract_email_body(msg) -> str:
+    """Extract text body from email message"""
+    body_parts = []
+    
+    if msg.is_multipart():
+        for part in msg.walk():
+            if part.get_content_type() == "text/plain":
+                try:
+                    body_parts.append(part.get_content())
+                except Exception as e:
+                    logger.warning(f"Error extracting text part: {e}")
+    else:
+        if msg.get_content_type() == "text/plain":
+            try:
+                body_parts.append(msg.get_content())
+            except Exception as e:
+                logger.warning(f"Error extracting text content: {e}")
+    
+    return "\n\n".join(body_parts)
+
+
+def _extract_attachments(msg) -> List[Dict[str, Any]]:
+    """Extract attachments from email message
+    
+    Attachment bodies are not decoded here; call ``load_content()`` on an
+    attachment to decode it when actually needed.
+    """
+    attachments = []
+    
+    if msg.is_multipart():
+        for part in msg.walk():
+            if part.get_content_disposition() == "attachment":
+                try:
+                    filename = part.get_filename()
+                    content_type = part.get_content_type()
+                    
+                    attachments.append({
+                        "filename": filename,
+                        "content_type": content_type,
+                        "load_content": part.get_content,
+                        "size": _attachment_size(part)
+                    })
+                except Exception as e:
+                    logger.warning(f"Error extracting attachment: {e}")
+    
+    return attachments
+
+
+def _attachment_size(part) -> int:
+    """Decoded size of an attachment, computed without decoding it"""
+    payload = part.get_payload()
+    if not isinstance(payload, str):
+        return 0
+    
+    if part.get("Content-Transfer-Encoding", "").strip().lower() == "base64":
+        encoded = "".join(payload.split())
+        return len(encoded) * 3 // 4 - encoded[-2:].count("=")
+    return len(payload)
+
+
 class EmailLoader(BaseLoader):
     """Email document loader for EML files"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, executor: Optional[Executor] = None):
+        super().__init__(executor)
         self.supported_extensions = ['.eml', '.msg']
         self.max_chunk_size = 1000
         self.chunk_overlap = 200
@@ -26,88 +117,14 @@ class EmailLoader(BaseLoader):
     async def load_document(self, file_path: str) -> Dict[str, Any]:
         """Load email document content and metadata"""
         try:
-            # Run in thread pool to avoid blocking
+            # MIME parsing holds the GIL, so it runs in the injected process pool if any
             loop = asyncio.get_event_loop()
-            content = await loop.run_in_executor(None, self._load_email_sync, file_path)
+            content = await loop.run_in_executor(self.executor, _load_email_sync, file_path)
             return content
         except Exception as e:
             logger.error(f"Error loading email {file_path}: {e}")
             raise
     
-    def _load_email_sync(self, file_path: str) -> Dict[str, Any]:
-        """Synchronous email loading"""
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            email_content = f.read()
-        
-        # Parse email
-        msg = email.message_from_string(email_content, policy=policy.default)
-        
-        # Extract headers
-        headers = dict(msg.items())
-        
-        # Extract body
-        body = self._extract_email_body(msg)
-        
-        # Extract attachments
-        attachments = self._extract_attachments(msg)
-        
-        return {
-            "headers": headers,
-            "body": body,
-            "attachments": attachments,
-            "metadata": {
-                "subject": headers.get("Subject", ""),
-                "from": headers.get("From", ""),
-                "to": headers.get("To", ""),
-                "date": headers.get("Date", ""),
-                "message_id": headers.get("Message-ID", ""),
-                "file_path": file_path
-            }
-        }
-    
-    def _extract_email_body(self, msg) -> str:
-        """Extract text body from email message"""
-        body_parts = []
-        
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        body_parts.append(part.get_content())
-                    except Exception as e:
-                        logger.warning(f"Error extracting text part: {e}")
-        else:
-            if msg.get_content_type() == "text/plain":
-                try:
-                    body_parts.append(msg.get_content())
-                except Exception as e:
-                    logger.warning(f"Error extracting text content: {e}")
-        
-        return "\n\n".join(body_parts)
-    
-    def _extract_attachments(self, msg) -> List[Dict[str, Any]]:
-        """Extract attachments from email message"""
-        attachments = []
-        
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_disposition() == "attachment":
-                    try:
-                        filename = part.get_filename()
-                        content_type = part.get_content_type()
-                        content = part.get_content()
-                        
-                        attachments.append({
-                            "filename": filename,
-                            "content_type": content_type,
-                            "content": content,
-                            "size": len(content) if content else 0
-                        })
-                    except Exception as e:
-                        logger.warning(f"Error extracting attachment: {e}")
-        
-        return attachments
-    
     def extract_text(self, content: Dict[str, Any]) -> str:
         """Extract text content from email"""
         body = content.get("body", "")
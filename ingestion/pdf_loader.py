@@ -3,7 +3,9 @@ PDF document loader using PyMuPDF
 """
 
 import asyncio
-from typing import Dict, Any, List
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 import fitz  # PyMuPDF
 import logging
@@ -12,12 +14,80 @@ from .base_loader import BaseLoader
 
 logger = logging.getLogger(__name__)
 
+# Plain text extraction; whitespace is collapsed by clean_text anyway and
+# ligatures are expanded so they match typed queries
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~(fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE)
+
+# Documents with at least this many pages are split across processes
+PARALLEL_PAGE_THRESHOLD = 64
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract text from pages [start, stop) using this process's own document handle"""
+    doc = fitz.open(file_path)
+    try:
+        return [page.get_text("text", flags=PDF_TEXT_FLAGS) for page in doc.pages(start, stop)]
+    finally:
+        doc.close()
+
+
+def _load_pdf_sync(file_path: str, split_pages: bool = True) -> Dict[str, Any]:
+    """Synchronous PDF loading, run in a worker process or thread
+    
+    Large documents are split across a private process pool unless
+    ``split_pages`` is False, e.g. when already running inside a shared pool.
+    """
+    doc = fitz.open(file_path)
+    page_count = len(doc)
+    
+    # Extract text from all pages
+    workers = min(os.cpu_count() or 1, page_count // (PARALLEL_PAGE_THRESHOLD // 2))
+    if split_pages and page_count >= PARALLEL_PAGE_THRESHOLD and workers > 1:
+        text_content = _extract_pages_parallel(file_path, page_count, workers)
+    else:
+        text_content = [page.get_text("text", flags=PDF_TEXT_FLAGS) for page in doc]
+    
+    # Get document metadata
+    metadata = doc.metadata
+    metadata.update({
+        "page_count": page_count,
+        "file_path": file_path
+    })
+    
+    doc.close()
+    
+    return {
+        "text_content": text_content,
+        "metadata": metadata,
+        "page_count": page_count
+    }
+
+
+def _extract_pages_parallel(file_path: str, page_count: int, workers: int) -> List[str]:
+    """Extract page text in contiguous ranges, one document handle per process
+    
+    MuPDF is not thread-safe and holds the GIL, so ranges go to separate
+    processes rather than threads.
+    """
+    step = -(-page_count // workers)
+    starts = range(0, page_count, step)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        ranges = executor.map(
+            _extract_page_range,
+            [file_path] * len(starts),
+            starts,
+            [min(start + step, page_count) for start in starts]
+        )
+        return [text for page_texts in ranges for text in page_texts]
+
 
 class PDFLoader(BaseLoader):
     """PDF document loader using PyMuPDF"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, executor: Optional[Executor] = None, split_pages: Optional[bool] = None):
+        super().__init__(executor)
+        # Defaults to splitting only when not already running on a shared pool
+        self.split_pages = executor is None if split_pages is None else split_pages
         self.supported_extensions = ['.pdf']
         self.max_chunk_size = 1000
         self.chunk_overlap = 200
@@ -25,40 +95,17 @@ class PDFLoader(BaseLoader):
     async def load_document(self, file_path: str) -> Dict[str, Any]:
         """Load PDF document content and metadata"""
         try:
-            # Run in thread pool to avoid blocking
+            # Run in the injected process pool if any, otherwise in a thread. Files
+            # already run in parallel on a shared pool, so its workers don't split pages
             loop = asyncio.get_event_loop()
-            content = await loop.run_in_executor(None, self._load_pdf_sync, file_path)
+            content = await loop.run_in_executor(
+                self.executor, _load_pdf_sync, file_path, self.split_pages
+            )
             return content
         except Exception as e:
             logger.error(f"Error loading PDF {file_path}: {e}")
             raise
     
-    def _load_pdf_sync(self, file_path: str) -> Dict[str, Any]:
-        """Synchronous PDF loading"""
-        doc = fitz.open(file_path)
-        
-        # Extract text from all pages
-        text_content = []
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text = page.get_text()
-            text_content.append(text)
-        
-        # Get document metadata
-        metadata = doc.metadata
-        metadata.update({
-            "page_count": len(doc),
-            "file_path": file_path
-        })
-        
-        doc.close()
-        
-        return {
-            "text_content": text_content,
-            "metadata": metadata,
-            "page_count": len(doc)
-        }
-    
     def extract_text(self, content: Dict[str, Any]) -> str:
         """Extract text content from PDF"""
         text_content = content.get("text_content", [])
@@ -70,8 +117,7 @@ class PDFLoader(BaseLoader):
             doc = fitz.open(file_path)
             images = []
             
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
+            for page_num, page in enumerate(doc):
                 image_list = page.get_images()
                 
                 for img_index, img in enumerate(image_list):
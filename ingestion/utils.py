@@ -2,14 +2,66 @@
 Utility functions for document processing
 """
 
+import os
 import re
 import hashlib
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
 from datetime import datetime
 import logging
+import numpy as np
+
+try:
+    import hyperscan
+except ImportError:  # optional, speeds up extract_entities on entity-free text
+    hyperscan = None
 
 logger = logging.getLogger(__name__)
 
+# Any whitespace run collapses to a single space
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Entity patterns, scanned in separate passes so that an email inside a URL
+# is found as both
+_EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+_URL_PATTERN = r'https?://[^\s]+'
+_ENTITY_RES = (
+    ("EMAIL", re.compile(_EMAIL_PATTERN)),
+    ("URL", re.compile(_URL_PATTERN)),
+)
+
+# Compiled DFA over the same patterns, used to skip text with no entities.
+# Word boundaries are dropped since Hyperscan's are ASCII-only; without them
+# it matches a superset of what _ENTITY_RES match.
+if hyperscan is not None:
+    _ENTITY_DB = hyperscan.Database()
+    _ENTITY_DB.compile(
+        expressions=[p.replace(r'\b', '').encode() for p in (_EMAIL_PATTERN, _URL_PATTERN)],
+        ids=[0, 1],
+        elements=2,
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * 2
+    )
+else:
+    _ENTITY_DB = None
+
+# Control characters that are not whitespace (\s already collapses \t, \n,
+# \x0b-\x0d and \x1c-\x1f), plus lone surrogates, which cannot be encoded
+# as UTF-8
+_CONTROL_CHARS = dict.fromkeys(
+    [*range(0x00, 0x09), *range(0x0E, 0x1C), 0x7F, *range(0xD800, 0xE000)]
+)
+
+# Anything clean_text would change: whitespace other than single inner
+# spaces, and the characters in _CONTROL_CHARS
+_NEEDS_CLEANING_RE = re.compile(r'[^\S ]| {2}|^ | \Z|[\x00-\x08\x0e-\x1b\x7f\ud800-\udfff]')
+
+# Lookup table of the code points str.split() treats as whitespace; all are
+# below U+3001, so higher code points clip to the final (non-space) entry
+_IS_SPACE = np.array([chr(c).isspace() for c in range(0x3002)])
+_IS_SPACE[-1] = False
+
 
 def chunk_text(text: str, max_chunk_size: int = 1000, overlap: int = 200) -> List[str]:
     """
@@ -23,37 +75,84 @@ def chunk_text(text: str, max_chunk_size: int = 1000, overlap: int = 200) -> Lis
     Returns:
         List of text chunks
     """
-    if len(text) <= max_chunk_size:
-        return [text]
+    return list(iter_chunks(text, max_chunk_size, overlap))
+
+
+def iter_chunks(text: str, max_chunk_size: int = 1000, overlap: int = 200) -> Iterator[str]:
+    """
+    Lazily split text into overlapping chunks (see chunk_text)
+    
+    Args:
+        text: Input text to chunk
+        max_chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+    
+    Returns:
+        Iterator over text chunks
+    """
+    text_length = len(text)
+    if text_length <= max_chunk_size:
+        yield text
+        return
+    
+    # Boundary thresholds are fixed offsets from each window start
+    min_sentence = int(max_chunk_size * 0.7)  # At least 70% of max size
+    min_paragraph = int(max_chunk_size * 0.5)
     
-    chunks = []
     start = 0
     
-    while start < len(text):
+    while start < text_length:
         end = start + max_chunk_size
         
         # Try to break at sentence boundary
-        if end < len(text):
+        if end < text_length:
             # Look for sentence endings
             sentence_end = text.rfind('.', start, end)
-            if sentence_end > start + max_chunk_size * 0.7:  # At least 70% of max size
+            if sentence_end > start + min_sentence:
                 end = sentence_end + 1
             else:
                 # Look for paragraph breaks
                 paragraph_end = text.rfind('\n\n', start, end)
-                if paragraph_end > start + max_chunk_size * 0.5:
+                if paragraph_end > start + min_paragraph:
                     end = paragraph_end + 2
         
         chunk = text[start:end].strip()
         if chunk:
-            chunks.append(chunk)
+            yield chunk
         
-        # Move start position with overlap
-        start = end - overlap
-        if start >= len(text):
+        # The window reached the end of the text; another overlapping
+        # window would only repeat its tail
+        if end >= text_length:
             break
+        
+        # Move start position with overlap, always making progress
+        start = max(end - overlap, start + 1)
+
+
+def stream_clean_and_chunk(text: str, max_chunk_size: int = 1000, overlap: int = 200,
+                           with_hash: bool = True) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Clean text and yield each chunk together with its hash
     
-    return chunks
+    Each chunk is hashed as soon as it is sliced, while it is still in
+    cache, instead of in a separate pass over all chunks.
+    
+    Args:
+        text: Raw text to clean and chunk
+        max_chunk_size: Maximum size of each chunk
+        overlap: Number of characters to overlap between chunks
+        with_hash: Whether to hash each chunk; if False the hash is None
+    
+    Returns:
+        Iterator of (chunk, chunk_hash) tuples
+    """
+    # Short text that is already clean is its own single chunk
+    if len(text) <= max_chunk_size and not _NEEDS_CLEANING_RE.search(text):
+        yield text, hash_chunk(text) if with_hash else None
+        return
+    
+    for chunk in iter_chunks(clean_text(text), max_chunk_size, overlap):
+        yield chunk, hash_chunk(chunk) if with_hash else None
 
 
 def clean_text(text: str) -> str:
@@ -69,25 +168,29 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove excessive newlines
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-    
-    # Remove control characters except newlines and tabs
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    
-    # Normalize unicode
-    text = text.encode('utf-8', errors='ignore').decode('utf-8')
+    # Collapse whitespace, then drop control characters and lone surrogates
+    # in a single translate pass, and strip leading/trailing whitespace
+    return _WHITESPACE_RE.sub(' ', text).translate(_CONTROL_CHARS).strip()
+
+
+def hash_chunk(chunk: Union[str, bytes]) -> str:
+    """
+    Hash chunk content with BLAKE2b
     
-    # Strip leading/trailing whitespace
-    text = text.strip()
+    Args:
+        chunk: Text chunk, or its UTF-8 encoding to avoid encoding it again
     
-    return text
+    Returns:
+        128-bit hex digest (same width as the previous MD5 hashes)
+    """
+    if isinstance(chunk, str):
+        chunk = chunk.encode()
+    return hashlib.blake2b(chunk, digest_size=16).hexdigest()
 
 
-def extract_metadata(content: Dict[str, Any], chunk: str, chunk_index: int) -> Dict[str, Any]:
+def extract_metadata(content: Dict[str, Any], chunk: str, chunk_index: int,
+                     precomputed_hash: Optional[str] = None,
+                     include_hash: bool = True) -> Dict[str, Any]:
     """
     Extract metadata from document content and chunk
     
@@ -95,17 +198,22 @@ def extract_metadata(content: Dict[str, Any], chunk: str, chunk_index: int) -> D
         content: Original document content
         chunk: Text chunk
         chunk_index: Index of the chunk
+        precomputed_hash: Chunk hash already computed by the caller, if any
+        include_hash: Whether to store the chunk hash in the metadata
     
     Returns:
         Dictionary of metadata
     """
+    word_count, avg_word_length, sentence_count, paragraph_count = _text_stats(chunk)
+    
     metadata = {
         "chunk_index": chunk_index,
         "chunk_size": len(chunk),
-        "word_count": len(chunk.split()),
-        "extraction_timestamp": datetime.utcnow().isoformat(),
-        "chunk_hash": hashlib.md5(chunk.encode()).hexdigest()
+        "word_count": word_count,
+        "extraction_timestamp": datetime.utcnow().isoformat()
     }
+    if include_hash:
+        metadata["chunk_hash"] = precomputed_hash or hash_chunk(chunk)
     
     # Add document-level metadata if available
     if "metadata" in content:
@@ -116,33 +224,57 @@ def extract_metadata(content: Dict[str, Any], chunk: str, chunk_index: int) -> D
     
     # Extract basic text statistics
     metadata.update({
-        "avg_word_length": _calculate_avg_word_length(chunk),
-        "sentence_count": _count_sentences(chunk),
-        "paragraph_count": _count_paragraphs(chunk)
+        "avg_word_length": avg_word_length,
+        "sentence_count": sentence_count,
+        "paragraph_count": paragraph_count
     })
     
     return metadata
 
 
-def _calculate_avg_word_length(text: str) -> float:
-    """Calculate average word length"""
-    words = text.split()
-    if not words:
-        return 0.0
-    return sum(len(word) for word in words) / len(words)
-
-
-def _count_sentences(text: str) -> int:
-    """Count sentences in text"""
-    # Simple sentence counting - can be improved with NLP
-    sentences = re.split(r'[.!?]+', text)
-    return len([s for s in sentences if s.strip()])
+def _text_stats(text: str) -> Tuple[int, float, int, int]:
+    """
+    Compute word, sentence and paragraph statistics in one vectorized pass
+    
+    Counts match ``text.split()`` for words, splitting on runs of ``.!?`` for
+    sentences and splitting on blank lines for paragraphs, ignoring empty
+    pieces.
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        Tuple of (word count, average word length, sentence count,
+        paragraph count)
+    """
+    if not text:
+        return 0, 0.0, 0, 0
+    
+    # One code point per element, so word lengths are in characters
+    a = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    is_word = ~_IS_SPACE[np.minimum(a, len(_IS_SPACE) - 1)]
+    
+    word_chars = int(np.count_nonzero(is_word))
+    word_count = int(np.count_nonzero(is_word[1:] & ~is_word[:-1])) + int(is_word[0])
+    avg_word_length = word_chars / word_count if word_count else 0.0
+    
+    is_end = (a == ord('.')) | (a == ord('!')) | (a == ord('?'))
+    sentence_count = _count_pieces(np.cumsum(is_end), is_word & ~is_end)
+    
+    is_newline = a == ord('\n')
+    blank_line = np.zeros(len(a), dtype=bool)
+    blank_line[1:] = is_newline[1:] & is_newline[:-1]
+    paragraph_count = _count_pieces(np.cumsum(blank_line), is_word)
+    
+    return word_count, avg_word_length, sentence_count, paragraph_count
 
 
-def _count_paragraphs(text: str) -> int:
-    """Count paragraphs in text"""
-    paragraphs = text.split('\n\n')
-    return len([p for p in paragraphs if p.strip()])
+def _count_pieces(piece_ids: np.ndarray, has_content: np.ndarray) -> int:
+    """Count distinct pieces, numbered in text order, that hold any content"""
+    ids = piece_ids[has_content]
+    if not len(ids):
+        return 0
+    return int(np.count_nonzero(ids[1:] != ids[:-1])) + 1
 
 
 def extract_entities(text: str) -> List[Dict[str, Any]]:
@@ -158,32 +290,37 @@ def extract_entities(text: str) -> List[Dict[str, Any]]:
     # TODO: Implement with spaCy or similar NLP library
     entities = []
     
-    # Simple pattern matching for common entities
-    # Email addresses
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    for email in emails:
-        entities.append({
-            "text": email,
-            "type": "EMAIL",
-            "start": text.find(email),
-            "end": text.find(email) + len(email)
-        })
+    if not _may_contain_entities(text):
+        return entities
     
-    # URLs
-    url_pattern = r'https?://[^\s]+'
-    urls = re.findall(url_pattern, text)
-    for url in urls:
-        entities.append({
-            "text": url,
-            "type": "URL",
-            "start": text.find(url),
-            "end": text.find(url) + len(url)
-        })
+    # Simple pattern matching for common entities (email addresses, then
+    # URLs), with positions taken from the match spans
+    for entity_type, pattern in _ENTITY_RES:
+        for match in pattern.finditer(text):
+            entities.append({
+                "text": match.group(0),
+                "type": entity_type,
+                "start": match.start(),
+                "end": match.end()
+            })
     
     return entities
 
 
+def _may_contain_entities(text: str) -> bool:
+    """Cheap check that rules out text in which _ENTITY_RES cannot match"""
+    if _ENTITY_DB is None:
+        return '@' in text or '://' in text
+    
+    matched = []
+    _ENTITY_DB.scan(
+        text.encode('utf-8', 'surrogatepass'),
+        match_event_handler=lambda pattern_id, start, end, flags, found: found.append(pattern_id),
+        context=matched
+    )
+    return bool(matched)
+
+
 def extract_keywords(text: str, top_k: int = 10) -> List[str]:
     """
     Extract keywords from text (placeholder for future implementation)
@@ -197,16 +334,55 @@ def extract_keywords(text: str, top_k: int = 10) -> List[str]:
     """
     # TODO: Implement with TF-IDF, TextRank, or similar
     # For now, return simple word frequency
-    words = re.findall(r'\b\w+\b', text.lower())
-    word_freq = {}
+    words = _WORD_RE.findall(text.lower())
+    word_freq = Counter(word for word in words if len(word) > 3)  # Filter out short words
+    
+    # Top-k by frequency (heap selection, ties in first-seen order)
+    return [word for word, freq in word_freq.most_common(top_k)]
+
+
+def word_fingerprint(text: str) -> np.ndarray:
+    """
+    Hash the distinct lower-cased words of a text into a sorted uint64 array
+    
+    Fingerprints are stable across processes, so they can be computed once
+    per chunk and reused for many comparisons.
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        Sorted array of unique 64-bit word hashes
+    """
+    words = set(text.lower().split())
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), 'little')
+         for word in words),
+        dtype=np.uint64,
+        count=len(words)
+    )
+    hashes.sort()
+    return hashes
+
+
+def fingerprint_similarity(fingerprint1: np.ndarray, fingerprint2: np.ndarray) -> float:
+    """
+    Jaccard similarity between two word fingerprints
     
-    for word in words:
-        if len(word) > 3:  # Filter out short words
-            word_freq[word] = word_freq.get(word, 0) + 1
+    Args:
+        fingerprint1: First fingerprint from word_fingerprint
+        fingerprint2: Second fingerprint from word_fingerprint
     
-    # Sort by frequency and return top_k
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, freq in sorted_words[:top_k]]
+    Returns:
+        Similarity score between 0 and 1
+    """
+    if not fingerprint1.size and not fingerprint2.size:
+        return 1.0
+    if not fingerprint1.size or not fingerprint2.size:
+        return 0.0
+    
+    intersection = np.intersect1d(fingerprint1, fingerprint2, assume_unique=True).size
+    return intersection / (fingerprint1.size + fingerprint2.size - intersection)
 
 
 def calculate_text_similarity(text1: str, text2: str) -> float:
@@ -220,18 +396,33 @@ def calculate_text_similarity(text1: str, text2: str) -> float:
     Returns:
         Similarity score between 0 and 1
     """
-    # Simple Jaccard similarity implementation
+    # Simple Jaccard similarity over hashed words
     # TODO: Implement more sophisticated similarity metrics
+    return fingerprint_similarity(word_fingerprint(text1), word_fingerprint(text2))
+
+
+def prefetch_files(file_paths: List[str]) -> None:
+    """
+    Ask the kernel to start reading files into the page cache
     
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
-    
-    if not words1 and not words2:
-        return 1.0
-    if not words1 or not words2:
-        return 0.0
-    
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
+    Readahead for every file is queued at once, so a batch of small files
+    is read concurrently by the kernel instead of one blocking read at a
+    time. No-op where posix_fadvise is unavailable.
     
-    return len(intersection) / len(union) 
\ No newline at end of file
+    Args:
+        file_paths: Files that are about to be loaded
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
\ No newline at end of file
@@ -5,12 +5,17 @@ Main entry point for gabo - AI-native platform for unified data processing
 
 import argparse
 import asyncio
+import glob
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from config import Config
 from ingestion.base_loader import BaseLoader
+from ingestion.cache import ChunkCache
+from ingestion.utils import prefetch_files
 from ingestion.pdf_loader import PDFLoader
 from ingestion.email_loader import EmailLoader
 from embeddings.embedder import Embedder
@@ -21,39 +26,69 @@ from storage.metadata_store import MetadataStore
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Items buffered between ingestion pipeline stages (backpressure on faster stages)
+PIPELINE_QUEUE_SIZE = 32
+
+# Files whose reads are queued with the kernel ahead of the parsers
+PREFETCH_FILES = 64
+
 
 class GaboApp:
     """Main application class for gabo platform"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, parse_workers: Optional[int] = None):
         self.config = config
         self.embedder = Embedder(config)
         self.vector_store = VectorStore(config)
         self.metadata_store = MetadataStore(config)
+        self.chunk_cache = ChunkCache(config.storage.chunk_cache_dir) if config.storage.chunk_cache_dir else None
+        self.parse_workers = parse_workers or os.cpu_count()
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        """Shared pool for CPU-bound document parsing, started on first use
+        
+        Parsing in threads would contend for the GIL.
+        """
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self._cpu_pool
+    
+    def close(self):
+        """Shut down the parsing pool, if it was started"""
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown()
+            self._cpu_pool = None
         
     async def process_file(self, file_path: str, file_type: Optional[str] = None) -> bool:
         """Process a single file through the ingestion pipeline"""
         try:
             # Determine loader based on file type
             if file_type == "pdf" or file_path.lower().endswith('.pdf'):
-                loader = PDFLoader()
+                loader = PDFLoader(self.cpu_pool)
             elif file_type == "email" or file_path.lower().endswith('.eml'):
-                loader = EmailLoader()
+                loader = EmailLoader(self.cpu_pool)
             else:
                 # Try to auto-detect
                 loader = self._get_loader_for_file(file_path)
             
             # Load and chunk the document
+            loader.chunk_cache = self.chunk_cache
+            loader.chunk_hash = self.config.storage.chunk_hash
             chunks = await loader.load_and_chunk(file_path)
             
             # Generate embeddings
-            embeddings = await self.embedder.embed_chunks(chunks)
-            
-            # Store in vector database
-            await self.vector_store.store_embeddings(embeddings, chunks)
+            embeddings = await self.embedder.embed_chunks([chunk.content for chunk in chunks])
             
-            # Store metadata
-            await self.metadata_store.store_metadata(chunks)
+            # Store vectors and metadata concurrently; neither depends on the other
+            stored, metadata_stored = await asyncio.gather(
+                self.vector_store.store_embeddings(embeddings, chunks),
+                self.metadata_store.store_metadata(chunks)
+            )
+            if not (stored and metadata_stored):
+                logger.error(f"Error storing {file_path}: vectors stored={stored}, metadata stored={metadata_stored}")
+                return False
             
             logger.info(f"Successfully processed {file_path}")
             return True
@@ -62,13 +97,90 @@ class GaboApp:
             logger.error(f"Error processing {file_path}: {e}")
             return False
     
+    async def process_paths(self, paths: List[str], parse_concurrency: int = 8,
+                            embed_concurrency: int = 4, write_concurrency: int = 8) -> Dict[str, bool]:
+        """Process many files through a pipelined load -> embed -> store flow
+        
+        Each stage runs its own pool of workers connected by bounded queues,
+        so parsing, embedding and database writes for different files overlap.
+        Returns whether each path was processed successfully.
+        """
+        results = {path: False for path in paths}
+        
+        pending: asyncio.Queue = asyncio.Queue()
+        for path in paths:
+            pending.put_nowait(path)
+        parsed: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        prefetched = 0
+        
+        async def parse():
+            nonlocal prefetched
+            while not pending.empty():
+                path = pending.get_nowait()
+                # Paths are taken in order; refill the readahead window once the
+                # parsers are halfway through it
+                taken = len(paths) - pending.qsize()
+                if taken > prefetched - PREFETCH_FILES // 2:
+                    prefetch_files(paths[prefetched:prefetched + PREFETCH_FILES])
+                    prefetched += PREFETCH_FILES
+                try:
+                    loader = self._get_loader_for_file(path)
+                    loader.chunk_cache = self.chunk_cache
+                    loader.chunk_hash = self.config.storage.chunk_hash
+                    chunks = await loader.load_and_chunk(path)
+                except Exception as e:
+                    logger.error(f"Error loading {path}: {e}")
+                    continue
+                await parsed.put((path, chunks))
+        
+        async def embed():
+            while (item := await parsed.get()) is not None:
+                path, chunks = item
+                try:
+                    embeddings = await self.embedder.embed_chunks([chunk.content for chunk in chunks])
+                except Exception as e:
+                    logger.error(f"Error embedding {path}: {e}")
+                    continue
+                await embedded.put((path, chunks, embeddings))
+        
+        async def write():
+            while (item := await embedded.get()) is not None:
+                path, chunks, embeddings = item
+                try:
+                    stored, metadata_stored = await asyncio.gather(
+                        self.vector_store.store_embeddings(embeddings, chunks),
+                        self.metadata_store.store_metadata(chunks)
+                    )
+                    results[path] = bool(stored and metadata_stored)
+                    if results[path]:
+                        logger.info(f"Successfully processed {path}")
+                    else:
+                        logger.error(f"Error storing {path}: vectors stored={stored}, metadata stored={metadata_stored}")
+                except Exception as e:
+                    logger.error(f"Error storing {path}: {e}")
+        
+        embedders = [asyncio.create_task(embed()) for _ in range(embed_concurrency)]
+        writers = [asyncio.create_task(write()) for _ in range(write_concurrency)]
+        
+        # Each stage signals the next one to stop once it has drained
+        await asyncio.gather(*[parse() for _ in range(parse_concurrency)])
+        for _ in embedders:
+            await parsed.put(None)
+        await asyncio.gather(*embedders)
+        for _ in writers:
+            await embedded.put(None)
+        await asyncio.gather(*writers)
+        
+        return results
+    
     def _get_loader_for_file(self, file_path: str) -> BaseLoader:
         """Auto-detect appropriate loader for file type"""
         ext = Path(file_path).suffix.lower()
         if ext == '.pdf':
-            return PDFLoader()
+            return PDFLoader(self.cpu_pool)
         elif ext in ['.eml', '.msg']:
-            return EmailLoader()
+            return EmailLoader(self.cpu_pool)
         else:
             raise ValueError(f"Unsupported file type: {ext}")
     
@@ -92,11 +204,44 @@ class GaboApp:
             return f"Error processing query: {e}"
 
 
+def _ingest_shard(config: Config, paths: List[str], parse_workers: int) -> Dict[str, bool]:
+    """Process one shard of paths in this process, with its own app and clients"""
+    app = GaboApp(config, parse_workers=parse_workers)
+    try:
+        return asyncio.run(app.process_paths(paths))
+    finally:
+        app.close()
+
+
+def parallel_bulk_ingest(config: Config, paths: List[str], n_workers: int = 8) -> Dict[str, bool]:
+    """Process paths split across worker processes, each with its own embedder and stores
+    
+    Every process runs the pipelined process_paths on its shard, so request
+    and row serialization are spread over n_workers interpreters instead of
+    sharing one. Parsing processes are divided between the shards. Returns
+    whether each path was processed successfully.
+    """
+    # Dealt round-robin, so a sorted run of large files is spread across shards
+    shards = [shard for shard in (paths[i::n_workers] for i in range(n_workers)) if shard]
+    if not shards:
+        return {}
+    parse_workers = max(1, (os.cpu_count() or 1) // len(shards))
+    
+    results: Dict[str, bool] = {}
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        for shard_results in pool.map(_ingest_shard, [config] * len(shards), shards,
+                                      [parse_workers] * len(shards)):
+            results.update(shard_results)
+    return results
+
+
 async def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="gabo - AI-native data platform")
     parser.add_argument("--config", default="config.yaml", help="Configuration file")
-    parser.add_argument("--file", help="Process a single file")
+    parser.add_argument("--file", help="Process a file, or every file matching a glob pattern")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to split a multi-file --file across, each with its own clients")
     parser.add_argument("--query", help="Query the system")
     parser.add_argument("--dev", action="store_true", help="Run in development mode")
     
@@ -108,24 +253,40 @@ async def main():
     # Initialize app
     app = GaboApp(config)
     
-    if args.file:
-        # Process a single file
-        success = await app.process_file(args.file)
-        print(f"File processing {'successful' if success else 'failed'}")
-        
-    elif args.query:
-        # Query the system
-        result = await app.query(args.query)
-        print(result)
-        
-    elif args.dev:
-        # Development mode - run some tests
-        print("Running in development mode...")
-        # TODO: Add development tests
-        
-    else:
-        print("gabo - AI-native data platform")
-        print("Use --file to process a file or --query to ask a question")
+    try:
+        if args.file:
+            paths = sorted(glob.glob(args.file, recursive=True)) or [args.file]
+            
+            if len(paths) == 1:
+                # Process a single file
+                success = await app.process_file(paths[0])
+                print(f"File processing {'successful' if success else 'failed'}")
+            else:
+                # Pipeline many files, in several processes if asked to
+                if args.workers > 1:
+                    results = await asyncio.get_running_loop().run_in_executor(
+                        None, parallel_bulk_ingest, config, paths, args.workers
+                    )
+                else:
+                    results = await app.process_paths(paths)
+                succeeded = sum(results.values())
+                print(f"Processed {succeeded}/{len(paths)} files successfully")
+            
+        elif args.query:
+            # Query the system
+            result = await app.query(args.query)
+            print(result)
+            
+        elif args.dev:
+            # Development mode - run some tests
+            print("Running in development mode...")
+            # TODO: Add development tests
+            
+        else:
+            print("gabo - AI-native data platform")
+            print("Use --file to process a file or --query to ask a question")
+    finally:
+        app.close()
 
 
 if __name__ == "__main__":
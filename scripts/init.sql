@@ -15,15 +15,16 @@ CREATE TABLE IF NOT EXISTS embeddings (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create index for vector similarity search
+-- Create index for vector similarity search (DB_VECTOR_INDEX=hnsw,
+-- DB_VECTOR_INDEX_PRECISION=float32; see scripts/init_database.py for others)
 CREATE INDEX IF NOT EXISTS embeddings_vector_idx 
 ON embeddings 
-USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
 
--- Create index for metadata queries
+-- Create index for metadata containment (@>) queries
 CREATE INDEX IF NOT EXISTS embeddings_metadata_idx 
-ON embeddings USING GIN (metadata);
+ON embeddings USING GIN (metadata jsonb_path_ops);
 
 -- Create documents table
 CREATE TABLE IF NOT EXISTS documents (
@@ -60,11 +61,14 @@ CREATE TABLE IF NOT EXISTS processing_logs (
 -- Create indexes for documents table
 CREATE INDEX IF NOT EXISTS documents_filename_idx ON documents(filename);
 CREATE INDEX IF NOT EXISTS documents_status_idx ON documents(processing_status);
-CREATE INDEX IF NOT EXISTS documents_file_path_idx ON documents(file_path);
+-- Unique, so documents can be upserted with ON CONFLICT (file_path)
+CREATE UNIQUE INDEX IF NOT EXISTS documents_file_path_key ON documents(file_path);
+CREATE INDEX IF NOT EXISTS documents_updated_at_idx ON documents(updated_at DESC);
+CREATE INDEX IF NOT EXISTS documents_metadata_idx ON documents USING GIN(metadata jsonb_path_ops);
 
 -- Create indexes for chunks table
 CREATE INDEX IF NOT EXISTS chunks_document_idx ON chunks(document_id);
-CREATE INDEX IF NOT EXISTS chunks_metadata_idx ON chunks USING GIN(metadata);
+CREATE INDEX IF NOT EXISTS chunks_metadata_idx ON chunks USING GIN(metadata jsonb_path_ops);
 
 -- Create indexes for processing_logs table
 CREATE INDEX IF NOT EXISTS processing_logs_document_idx ON processing_logs(document_id);
@@ -5,6 +5,7 @@ Database initialization script for gabo platform
 
 import asyncio
 import asyncpg
+import json
 import logging
 from pathlib import Path
 import sys
@@ -13,6 +14,9 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config import Config
+from storage.vector_store import vector_index_definition
+from storage.metadata_store import add_file_path_key
+from pgvector.asyncpg import register_vector
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,17 +32,21 @@ async def init_database():
     try:
         # Connect to PostgreSQL
         logger.info("Connecting to PostgreSQL...")
-        conn = await asyncpg.connect(
+        pool = await asyncpg.create_pool(
             host=db_config.host,
             port=db_config.port,
             database=db_config.database,
             user=db_config.username,
-            password=db_config.password
+            password=db_config.password,
+            min_size=1,
+            max_size=db_config.pool_max_size
         )
+        conn = await pool.acquire()
         
         # Enable PGVector extension
         logger.info("Enabling PGVector extension...")
         await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        await register_vector(conn)
         
         # Create embeddings table
         logger.info("Creating embeddings table...")
@@ -56,18 +64,17 @@ async def init_database():
         
         # Create index for vector similarity search
         logger.info("Creating vector index...")
-        await conn.execute("""
+        await conn.execute(f"""
             CREATE INDEX IF NOT EXISTS embeddings_vector_idx 
             ON embeddings 
-            USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 100)
+            USING {vector_index_definition(db_config)}
         """)
         
         # Create index for metadata queries
         logger.info("Creating metadata index...")
         await conn.execute("""
             CREATE INDEX IF NOT EXISTS embeddings_metadata_idx 
-            ON embeddings USING GIN (metadata)
+            ON embeddings USING GIN (metadata jsonb_path_ops)
         """)
         
         # Create documents table
@@ -119,8 +126,19 @@ async def init_database():
         await conn.execute("""
             CREATE INDEX IF NOT EXISTS documents_status_idx ON documents(processing_status)
         """)
+        # Unique, so documents can be upserted with ON CONFLICT (file_path);
+        # replaces the earlier non-unique index on the same column. Duplicate
+        # rows of existing databases are merged first
+        await add_file_path_key(conn)
         await conn.execute("""
-            CREATE INDEX IF NOT EXISTS documents_file_path_idx ON documents(file_path)
+            DROP INDEX IF EXISTS documents_file_path_idx
+        """)
+        # Serves the ORDER BY updated_at DESC LIMIT of the recent activity stats
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS documents_updated_at_idx ON documents(updated_at DESC)
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS documents_metadata_idx ON documents USING GIN(metadata jsonb_path_ops)
         """)
         
         # Create indexes for chunks table
@@ -129,7 +147,7 @@ async def init_database():
             CREATE INDEX IF NOT EXISTS chunks_document_idx ON chunks(document_id)
         """)
         await conn.execute("""
-            CREATE INDEX IF NOT EXISTS chunks_metadata_idx ON chunks USING GIN(metadata)
+            CREATE INDEX IF NOT EXISTS chunks_metadata_idx ON chunks USING GIN(metadata jsonb_path_ops)
         """)
         
         # Create indexes for processing_logs table
@@ -150,19 +168,21 @@ async def init_database():
             logger.error("❌ PGVector extension is not enabled")
             return False
         
-        # Test vector operations
+        # Test vector operations through the same COPY path used for ingestion
         logger.info("Testing vector operations...")
-        await conn.execute("""
-            INSERT INTO embeddings (content, embedding, metadata, source_file, chunk_index)
-            VALUES ('test content', '[0.1, 0.2, 0.3]'::vector, '{"test": true}', 'test.txt', 0)
-        """)
+        await conn.copy_records_to_table(
+            'embeddings',
+            records=[('test content', [0.1] * 1536, json.dumps({"test": True}), 'test.txt', 0)],
+            columns=['content', 'embedding', 'metadata', 'source_file', 'chunk_index']
+        )
         
         # Clean up test data
         await conn.execute("DELETE FROM embeddings WHERE source_file = 'test.txt'")
         
         logger.info("✅ Vector operations test passed")
         
-        await conn.close()
+        await pool.release(conn)
+        await pool.close()
         logger.info("✅ Database initialization completed successfully!")
         return True
         
@@ -4,11 +4,14 @@ Storage module for gabo platform
 
 from .vector_store import VectorStore
 from .metadata_store import MetadataStore
+from .pool import get_pool, close_pools
 from .schemas import DocumentChunk, SearchResult
 
 __all__ = [
     "VectorStore",
     "MetadataStore",
+    "get_pool",
+    "close_pools",
     "DocumentChunk",
     "SearchResult"
 ] 
\ No newline at end of file
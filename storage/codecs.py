@@ -0,0 +1,36 @@
+"""
+Type codecs registered on each pooled database connection
+"""
+
+from typing import Any
+import orjson
+
+# Binary jsonb values are a version byte followed by the JSON text
+_JSONB_VERSION = b'\x01'
+# Like json.dumps, coerce int/float/bool dict keys to strings instead of failing
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a Python value as binary jsonb"""
+    return _JSONB_VERSION + orjson.dumps(value, option=_ORJSON_OPTIONS)
+
+
+def decode_jsonb(data: bytes) -> Any:
+    """Decode binary jsonb into Python values"""
+    return orjson.loads(memoryview(data)[1:])
+
+
+async def register_jsonb(conn):
+    """Exchange jsonb as Python values instead of JSON text on this connection
+
+    The codec uses the binary format so that it also applies to COPY, which
+    asyncpg only supports with binary encoders.
+    """
+    await conn.set_type_codec(
+        'jsonb',
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        schema='pg_catalog',
+        format='binary'
+    )
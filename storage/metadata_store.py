@@ -6,34 +6,73 @@ import asyncio
 from typing import List, Dict, Any, Optional
 import logging
 import asyncpg
-import json
 from datetime import datetime
 
 from config import Config
+from .pool import get_pool
 from .schemas import DocumentChunk
+# Chunk rows switch to COPY at the same size as embedding rows
+from .vector_store import COPY_MIN_ROWS
 
 logger = logging.getLogger(__name__)
 
+# Older rows of each file_path, i.e. every row but the most recently updated
+_STALE_DOCUMENTS = """
+    SELECT id, keep_id FROM (
+        SELECT id, first_value(id) OVER (
+            PARTITION BY file_path ORDER BY updated_at DESC NULLS LAST, id DESC
+        ) AS keep_id
+        FROM documents
+    ) ranked
+    WHERE id <> keep_id
+"""
+
+
+async def add_file_path_key(conn):
+    """Create the unique index on documents.file_path, first removing duplicates
+    
+    Databases created before the upsert could hold several rows per path.
+    The most recently updated row is kept; the logs of the others move to
+    it and their chunks are deleted. Does nothing once the index exists.
+    """
+    async with conn.transaction():
+        # Serializes concurrent startups (API, workers, init script)
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext('documents_file_path_key'))")
+        if await conn.fetchval("SELECT to_regclass('documents_file_path_key')") is not None:
+            return
+        
+        await conn.execute(f"""
+            UPDATE processing_logs l SET document_id = s.keep_id
+            FROM ({_STALE_DOCUMENTS}) s WHERE l.document_id = s.id
+        """)
+        await conn.execute(f"""
+            DELETE FROM chunks c USING ({_STALE_DOCUMENTS}) s WHERE c.document_id = s.id
+        """)
+        removed = await conn.execute(f"""
+            DELETE FROM documents d USING ({_STALE_DOCUMENTS}) s WHERE d.id = s.id
+        """)
+        if removed != "DELETE 0":
+            logger.warning(f"Removed duplicate document rows before adding the file_path key: {removed}")
+        
+        await conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS documents_file_path_key ON documents(file_path)
+        """)
+
 
 class MetadataStore:
     """Metadata store for managing document metadata"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, pool: Optional[asyncpg.Pool] = None):
         self.config = config
         self.db_config = config.database
-        self.pool = None
+        # Shared with the other store unless a pool is passed in
+        self.pool = pool
     
     async def connect(self):
         """Establish database connection pool"""
         if self.pool is None:
             try:
-                self.pool = await asyncpg.create_pool(
-                    host=self.db_config.host,
-                    port=self.db_config.port,
-                    database=self.db_config.database,
-                    user=self.db_config.username,
-                    password=self.db_config.password
-                )
+                self.pool = await get_pool(self.config)
                 
                 logger.info("Connected to PostgreSQL for metadata")
                 
@@ -42,10 +81,8 @@ class MetadataStore:
                 raise
     
     async def close(self):
-        """Close database connection pool"""
-        if self.pool:
-            await self.pool.close()
-            self.pool = None
+        """Release this store's reference to the shared pool (closed by close_pools)"""
+        self.pool = None
     
     async def initialize_tables(self):
         """Initialize metadata tables"""
@@ -98,11 +135,22 @@ class MetadataStore:
                 await conn.execute("""
                     CREATE INDEX IF NOT EXISTS documents_status_idx ON documents(processing_status)
                 """)
+                # Unique, so documents can be upserted with ON CONFLICT (file_path)
+                await add_file_path_key(conn)
                 await conn.execute("""
                     CREATE INDEX IF NOT EXISTS chunks_document_idx ON chunks(document_id)
                 """)
+                # Serves the ORDER BY updated_at DESC LIMIT of the recent activity stats
                 await conn.execute("""
-                    CREATE INDEX IF NOT EXISTS chunks_metadata_idx ON chunks USING GIN(metadata)
+                    CREATE INDEX IF NOT EXISTS documents_updated_at_idx ON documents(updated_at DESC)
+                """)
+                # jsonb_path_ops indexes only support containment (@>), and are
+                # smaller and faster for it than the default opclass
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS documents_metadata_idx ON documents USING GIN(metadata jsonb_path_ops)
+                """)
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS chunks_metadata_idx ON chunks USING GIN(metadata jsonb_path_ops)
                 """)
                 
                 logger.info("Initialized metadata tables")
@@ -114,67 +162,106 @@ class MetadataStore:
     async def store_metadata(self, chunks: List[DocumentChunk]) -> bool:
         """Store metadata for document chunks"""
         try:
-            await self.connect()
+            return await self.commit_document(chunks)
+        except Exception:
+            return False
+    
+    async def commit_document(self, chunks: List[DocumentChunk], message: Optional[str] = None) -> bool:
+        """Store a document's chunk metadata and mark it completed in one transaction
+        
+        With a message, the completion is also logged to processing_logs, by
+        the same statement that upserts the document, instead of a separate
+        update_processing_status call. Raises on failure, so callers can tell
+        a lost connection from other errors.
+        """
+        try:
+            if self.pool is None:
+                await self.connect()
             
-            async with self.pool.acquire() as conn:
-                # First, create or update document record
-                source_file = chunks[0].source_file if chunks else ""
-                document_id = await self._get_or_create_document(conn, source_file)
-                
-                # Store chunk metadata
-                for chunk in chunks:
-                    await conn.execute("""
-                        INSERT INTO chunks (document_id, chunk_index, content, metadata)
-                        VALUES ($1, $2, $3, $4)
-                    """, document_id, chunk.chunk_index, chunk.content, chunk.metadata)
-                
-                # Update document status
-                await conn.execute("""
-                    UPDATE documents 
-                    SET processing_status = 'completed', updated_at = CURRENT_TIMESTAMP
-                    WHERE id = $1
-                """, document_id)
-                
-                logger.info(f"Stored metadata for {len(chunks)} chunks")
+            # The document row and its chunks commit together, so the document is
+            # never marked completed without its chunks
+            async with self.pool.acquire() as conn, conn.transaction():
+                await self.write_document(conn, chunks, message)
                 return True
                 
         except Exception as e:
             logger.error(f"Error storing metadata: {e}")
-            return False
+            raise
     
-    async def _get_or_create_document(self, conn, source_file: str) -> int:
-        """Get or create document record"""
-        # Check if document exists
-        doc_id = await conn.fetchval("""
-            SELECT id FROM documents WHERE file_path = $1
-        """, source_file)
+    async def write_document(self, conn, chunks: List[DocumentChunk], message: Optional[str] = None) -> int:
+        """Store a document's chunk metadata and mark it completed on a connection
         
-        if doc_id:
-            return doc_id
+        For a connection already in a transaction, e.g. VectorStore.transaction(),
+        so the document commits together with its vectors. Raises on failure;
+        returns the document id.
+        """
+        # Create or update the document record, already marked completed
+        source_file = chunks[0].source_file if chunks else ""
+        document_id = await self._upsert_document(conn, source_file, 'completed', message)
         
-        # Create new document record
-        doc_id = await conn.fetchval("""
-            INSERT INTO documents (filename, file_path, processing_status)
-            VALUES ($1, $2, 'processing')
-            RETURNING id
-        """, source_file.split('/')[-1], source_file)
+        # Store chunk metadata in one batch instead of a round-trip per chunk
+        records = [
+            (document_id, chunk.chunk_index, chunk.content, chunk.metadata)
+            for chunk in chunks
+        ]
+        if len(records) >= COPY_MIN_ROWS:
+            await conn.copy_records_to_table(
+                'chunks',
+                records=records,
+                columns=['document_id', 'chunk_index', 'content', 'metadata']
+            )
+        else:
+            await conn.executemany("""
+                INSERT INTO chunks (document_id, chunk_index, content, metadata)
+                VALUES ($1, $2, $3, $4)
+            """, records)
+        
+        logger.info(f"Stored metadata for {len(chunks)} chunks")
+        return document_id
+    
+    async def _upsert_document(self, conn, source_file: str, status: str,
+                               message: Optional[str] = None) -> int:
+        """Create or update the document record with the given status, logging message if given"""
+        # One round-trip, and concurrent stores of the same file get the same row
+        if message is None:
+            doc_id = await conn.fetchval("""
+                INSERT INTO documents (filename, file_path, processing_status)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (file_path) DO UPDATE
+                SET processing_status = EXCLUDED.processing_status, updated_at = CURRENT_TIMESTAMP
+                RETURNING id
+            """, source_file.split('/')[-1], source_file, status)
+        else:
+            doc_id = await conn.fetchval("""
+                WITH document AS (
+                    INSERT INTO documents (filename, file_path, processing_status)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT (file_path) DO UPDATE
+                    SET processing_status = EXCLUDED.processing_status, updated_at = CURRENT_TIMESTAMP
+                    RETURNING id
+                ), logged AS (
+                    INSERT INTO processing_logs (document_id, status, message)
+                    SELECT id, $3, $4 FROM document
+                )
+                SELECT id FROM document
+            """, source_file.split('/')[-1], source_file, status, message)
         
         return doc_id
     
     async def get_document_metadata(self, source_file: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a specific document"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
+            
+            row = await self.pool.fetchrow("""
+                SELECT * FROM documents WHERE file_path = $1
+            """, source_file)
+            
+            if row:
+                return dict(row)
+            return None
             
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow("""
-                    SELECT * FROM documents WHERE file_path = $1
-                """, source_file)
-                
-                if row:
-                    return dict(row)
-                return None
-                
         except Exception as e:
             logger.error(f"Error getting document metadata: {e}")
             return None
@@ -182,18 +269,19 @@ class MetadataStore:
     async def get_chunks_for_document(self, source_file: str) -> List[Dict[str, Any]]:
         """Get all chunks for a specific document"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
+            
+            # The chunks come back as one jsonb array, decoded by the pooled
+            # codec, instead of one row message per chunk
+            chunks = await self.pool.fetchval("""
+                SELECT jsonb_agg(c ORDER BY c.chunk_index) FROM chunks c
+                JOIN documents d ON c.document_id = d.id
+                WHERE d.file_path = $1
+            """, source_file)
+            
+            return chunks or []
             
-            async with self.pool.acquire() as conn:
-                rows = await conn.fetch("""
-                    SELECT c.* FROM chunks c
-                    JOIN documents d ON c.document_id = d.id
-                    WHERE d.file_path = $1
-                    ORDER BY c.chunk_index
-                """, source_file)
-                
-                return [dict(row) for row in rows]
-                
         except Exception as e:
             logger.error(f"Error getting chunks: {e}")
             return []
@@ -201,59 +289,49 @@ class MetadataStore:
     async def update_processing_status(self, source_file: str, status: str, message: str = ""):
         """Update processing status for a document"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
             
-            async with self.pool.acquire() as conn:
-                # Update document status
-                await conn.execute("""
+            # Update the document status and log the change in one statement;
+            # nothing is logged for an unknown file
+            await self.pool.execute("""
+                WITH updated AS (
                     UPDATE documents 
                     SET processing_status = $2, updated_at = CURRENT_TIMESTAMP
                     WHERE file_path = $1
-                """, source_file, status)
-                
-                # Log the status change
-                doc_id = await conn.fetchval("""
-                    SELECT id FROM documents WHERE file_path = $1
-                """, source_file)
-                
-                if doc_id:
-                    await conn.execute("""
-                        INSERT INTO processing_logs (document_id, status, message)
-                        VALUES ($1, $2, $3)
-                    """, doc_id, status, message)
-                
-                logger.info(f"Updated status for {source_file}: {status}")
-                
+                    RETURNING id
+                )
+                INSERT INTO processing_logs (document_id, status, message)
+                SELECT id, $2, $3 FROM updated
+            """, source_file, status, message)
+            
+            logger.info(f"Updated status for {source_file}: {status}")
+            
         except Exception as e:
             logger.error(f"Error updating processing status: {e}")
     
     async def search_metadata(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Search documents by metadata"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
             
-            async with self.pool.acquire() as conn:
-                # Build dynamic query based on metadata filters
-                conditions = []
-                values = []
-                param_count = 0
-                
-                for key, value in query.items():
-                    param_count += 1
-                    conditions.append(f"metadata->>'{key}' = ${param_count}")
-                    values.append(str(value))
-                
-                where_clause = " AND ".join(conditions) if conditions else "TRUE"
-                
-                query_sql = f"""
+            # Filter values and keys are bound, never formatted into the SQL,
+            # so each query text is constant and its prepared plan is reused
+            if query:
+                # One containment predicate, which the GIN index on metadata can serve
+                rows = await self.pool.fetch("""
                     SELECT * FROM documents 
-                    WHERE {where_clause}
+                    WHERE metadata @> $1::jsonb
                     ORDER BY created_at DESC
-                """
-                
-                rows = await conn.fetch(query_sql, *values)
-                return [dict(row) for row in rows]
-                
+                """, query)
+            else:
+                rows = await self.pool.fetch("""
+                    SELECT * FROM documents 
+                    ORDER BY created_at DESC
+                """)
+            return [dict(row) for row in rows]
+            
         except Exception as e:
             logger.error(f"Error searching metadata: {e}")
             return []
@@ -261,37 +339,37 @@ class MetadataStore:
     async def get_processing_stats(self) -> Dict[str, Any]:
         """Get processing statistics"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
+            
+            # Everything in one statement, so the stats cost a single round-trip;
+            # the row sets come back aggregated as jsonb arrays
+            row = await self.pool.fetchrow("""
+                SELECT
+                    (SELECT COUNT(*) FROM documents) AS total_documents,
+                    (SELECT COUNT(*) FROM chunks) AS total_chunks,
+                    (SELECT jsonb_agg(s) FROM (
+                        SELECT processing_status, COUNT(*) AS count
+                        FROM documents
+                        GROUP BY processing_status
+                    ) s) AS status_counts,
+                    (SELECT jsonb_agg(r ORDER BY r.updated_at DESC) FROM (
+                        SELECT filename, processing_status, updated_at
+                        FROM documents
+                        ORDER BY updated_at DESC
+                        LIMIT 10
+                    ) r) AS recent_activity
+            """)
+            
+            # jsonb_agg is NULL rather than an empty array when there are no rows
+            status_counts = row['status_counts'] or []
+            return {
+                "total_documents": row['total_documents'],
+                "total_chunks": row['total_chunks'],
+                "status_breakdown": {s['processing_status']: s['count'] for s in status_counts},
+                "recent_activity": row['recent_activity'] or []
+            }
             
-            async with self.pool.acquire() as conn:
-                # Document counts by status
-                status_counts = await conn.fetch("""
-                    SELECT processing_status, COUNT(*) as count
-                    FROM documents
-                    GROUP BY processing_status
-                """)
-                
-                # Total documents
-                total_docs = await conn.fetchval("SELECT COUNT(*) FROM documents")
-                
-                # Total chunks
-                total_chunks = await conn.fetchval("SELECT COUNT(*) FROM chunks")
-                
-                # Recent activity
-                recent_activity = await conn.fetch("""
-                    SELECT filename, processing_status, updated_at
-                    FROM documents
-                    ORDER BY updated_at DESC
-                    LIMIT 10
-                """)
-                
-                return {
-                    "total_documents": total_docs,
-                    "total_chunks": total_chunks,
-                    "status_breakdown": {row['processing_status']: row['count'] for row in status_counts},
-                    "recent_activity": [dict(row) for row in recent_activity]
-                }
-                
         except Exception as e:
             logger.error(f"Error getting processing stats: {e}")
             return {} 
\ No newline at end of file
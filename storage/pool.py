@@ -0,0 +1,81 @@
+"""
+Connection pool shared by the vector and metadata stores
+"""
+
+import asyncio
+from typing import Dict, Tuple
+import logging
+import asyncpg
+from pgvector.asyncpg import register_vector
+
+from config import Config
+from .codecs import register_jsonb
+
+logger = logging.getLogger(__name__)
+
+# One pool per database, along with the event loop it is bound to. The pool is
+# held as the task creating it, so concurrent first callers share one pool
+_pools: Dict[Tuple, Tuple[asyncio.AbstractEventLoop, "asyncio.Task[asyncpg.Pool]"]] = {}
+
+
+async def _init_conn(conn):
+    """Register type codecs on each new pooled connection
+
+    Every connection needs them, not just the first one acquired, e.g. for
+    COPY of vectors and jsonb.
+    """
+    try:
+        await register_vector(conn)
+    except ValueError as e:
+        # The vector extension is created by scripts/init_database.py
+        logger.warning(f"Vector type not registered: {e}")
+    await register_jsonb(conn)
+
+
+def _is_usable(task: "asyncio.Task[asyncpg.Pool]") -> bool:
+    """Whether a pool task is still creating its pool or holds an open one"""
+    if not task.done():
+        return True
+    return not task.cancelled() and task.exception() is None and not task.result().is_closing()
+
+
+async def get_pool(config: Config) -> asyncpg.Pool:
+    """Get the pool for the configured database, creating it on first use"""
+    db_config = config.database
+    key = (db_config.host, db_config.port, db_config.database, db_config.username)
+    loop = asyncio.get_running_loop()
+
+    entry = _pools.get(key)
+    if entry is None or entry[0] is not loop or not _is_usable(entry[1]):
+        task = loop.create_task(asyncpg.create_pool(
+            host=db_config.host,
+            port=db_config.port,
+            database=db_config.database,
+            user=db_config.username,
+            password=db_config.password,
+            min_size=db_config.pool_min_size,
+            max_size=db_config.pool_max_size,
+            init=_init_conn
+        ))
+        entry = _pools[key] = (loop, task)
+
+    try:
+        return await asyncio.shield(entry[1])
+    except Exception:
+        # Let the next caller retry instead of caching the failure
+        if _pools.get(key) is entry:
+            del _pools[key]
+        raise
+
+
+async def close_pools():
+    """Close every pool created on the running event loop"""
+    loop = asyncio.get_running_loop()
+    for key, (pool_loop, task) in list(_pools.items()):
+        if pool_loop is loop:
+            del _pools[key]
+            try:
+                pool = await task
+            except Exception:
+                continue
+            await pool.close()
@@ -4,6 +4,8 @@ Pydantic models for storage schemas
 
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from functools import cached_property
+import hashlib
 from pydantic import BaseModel, Field
 
 
@@ -18,6 +20,13 @@ class DocumentChunk(BaseModel):
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+    
+    @cached_property
+    def chunk_hash(self) -> str:
+        """BLAKE2b hash of the content, computed on first access"""
+        return self.metadata.get("chunk_hash") or hashlib.blake2b(
+            self.content.encode(), digest_size=16
+        ).hexdigest()
 
 
 class SearchResult(BaseModel):
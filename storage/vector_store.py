@@ -2,42 +2,86 @@
 PGVector wrapper for vector storage
 """
 
-import asyncio
-from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Tuple, Union
 import logging
+import time
 import asyncpg
 import numpy as np
-from pgvector.asyncpg import register_vector
 
-from config import Config
-from .schemas import SearchResult
+from config import Config, DatabaseConfig
+from .pool import get_pool
+from .schemas import DocumentChunk, SearchResult
 
 logger = logging.getLogger(__name__)
 
+# Vector index definitions by DatabaseConfig.vector_index. HNSW needs no
+# training data and has better recall/latency; IVFFlat uses less memory
+VECTOR_INDEX_METHODS = {
+    "hnsw": "hnsw ({key}) WITH (m = 16, ef_construction = 64)",
+    "ivfflat": "ivfflat ({key}) WITH (lists = 100)",
+}
+
+# Indexed key and the matching ORDER BY distance by
+# DatabaseConfig.vector_index_precision. A float16 (halfvec) index is half the
+# size; similarities are still computed from the stored float32 vectors
+VECTOR_INDEX_PRECISIONS = {
+    "float32": ("embedding vector_cosine_ops", "embedding <=> $1"),
+    "float16": ("(embedding::halfvec(1536)) halfvec_cosine_ops",
+                "embedding::halfvec(1536) <=> $1::vector::halfvec(1536)"),
+}
+
+# Batches of at least this many rows are bulk-loaded with COPY instead of
+# executemany; below it, COPY's setup costs more than it saves
+COPY_MIN_ROWS = 500
+
+# write_bulk_embeddings writes slices of this many rows
+BULK_STORE_BATCH_ROWS = 1000
+
+# Slice sizes tried by VectorStore.tune_bulk_store, and the probe rows written
+# at each size with either method
+TUNE_BATCH_SIZES = (32, 64, 128, 256, 512, 1024)
+TUNE_PROBE_ROWS = 1024
+
+# Tuned (copy_min_rows, bulk_batch_rows) per database, so the stores of a
+# process probe it once
+_tuned: Dict[Tuple, Tuple[int, int]] = {}
+
+
+def vector_index_definition(db_config: DatabaseConfig) -> str:
+    """Index method and key of the vector index, for CREATE INDEX ... USING"""
+    key, _ = VECTOR_INDEX_PRECISIONS[db_config.vector_index_precision]
+    return VECTOR_INDEX_METHODS[db_config.vector_index].format(key=key)
+
+
+async def _seconds_per_row(write: Callable[[List[tuple]], Awaitable[Any]],
+                           records: List[tuple], batch_size: int) -> float:
+    """Time writing records in slices of batch_size, per row"""
+    start = time.perf_counter()
+    for i in range(0, len(records), batch_size):
+        await write(records[i:i + batch_size])
+    return (time.perf_counter() - start) / len(records)
+
 
 class VectorStore:
     """PGVector wrapper for storing and searching embeddings"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, pool: Optional[asyncpg.Pool] = None):
         self.config = config
         self.db_config = config.database
-        self.pool = None
+        # Shared with the other store unless a pool is passed in
+        self.pool = pool
+        # Distance expression that the vector index can serve
+        _, self.index_distance = VECTOR_INDEX_PRECISIONS[self.db_config.vector_index_precision]
+        # Write batch sizes, replaced by measured ones when bulk_store_tune is set
+        self.copy_min_rows = COPY_MIN_ROWS
+        self.bulk_batch_rows = BULK_STORE_BATCH_ROWS
     
     async def connect(self):
         """Establish database connection pool"""
         if self.pool is None:
             try:
-                self.pool = await asyncpg.create_pool(
-                    host=self.db_config.host,
-                    port=self.db_config.port,
-                    database=self.db_config.database,
-                    user=self.db_config.username,
-                    password=self.db_config.password
-                )
-                
-                # Register vector type
-                async with self.pool.acquire() as conn:
-                    await register_vector(conn)
+                self.pool = await get_pool(self.config)
                 
                 logger.info("Connected to PostgreSQL with PGVector")
                 
@@ -46,10 +90,8 @@ class VectorStore:
                 raise
     
     async def close(self):
-        """Close database connection pool"""
-        if self.pool:
-            await self.pool.close()
-            self.pool = None
+        """Release this store's reference to the shared pool (closed by close_pools)"""
+        self.pool = None
     
     async def initialize_tables(self):
         """Initialize vector and metadata tables"""
@@ -71,17 +113,16 @@ class VectorStore:
                 """)
                 
                 # Create index for vector similarity search
-                await conn.execute("""
+                await conn.execute(f"""
                     CREATE INDEX IF NOT EXISTS embeddings_vector_idx 
                     ON embeddings 
-                    USING ivfflat (embedding vector_cosine_ops)
-                    WITH (lists = 100)
+                    USING {vector_index_definition(self.db_config)}
                 """)
                 
                 # Create index for metadata queries
                 await conn.execute("""
                     CREATE INDEX IF NOT EXISTS embeddings_metadata_idx 
-                    ON embeddings USING GIN (metadata)
+                    ON embeddings USING GIN (metadata jsonb_path_ops)
                 """)
                 
                 logger.info("Initialized vector storage tables")
@@ -90,57 +131,216 @@ class VectorStore:
             logger.error(f"Error initializing tables: {e}")
             raise
     
-    async def store_embeddings(self, embeddings: List[List[float]], 
-                              chunks: List[Dict[str, Any]]) -> bool:
-        """Store embeddings and their associated chunks"""
+    async def store_embeddings(self, embeddings: Union[np.ndarray, List[List[float]]], 
+                              chunks: List[DocumentChunk], synchronous_commit: bool = True) -> bool:
+        """Store embeddings and their associated chunks
+        
+        With synchronous_commit off, the write commits without waiting for its
+        WAL to be flushed; a server crash can then lose the last moments of
+        writes, but never corrupts the table.
+        """
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
+            
+            records = self._records(embeddings, chunks)
             
             async with self.pool.acquire() as conn:
-                # Prepare batch insert
-                values = []
-                for i, (embedding, chunk) in enumerate(zip(embeddings, chunks)):
-                    values.append((
-                        chunk.get('content', ''),
-                        embedding,
-                        chunk.get('metadata', {}),
-                        chunk.get('source_file', ''),
-                        chunk.get('chunk_index', i)
-                    ))
-                
-                # Batch insert
-                await conn.executemany("""
-                    INSERT INTO embeddings (content, embedding, metadata, source_file, chunk_index)
-                    VALUES ($1, $2, $3, $4, $5)
-                """, values)
-                
-                logger.info(f"Stored {len(embeddings)} embeddings")
+                if synchronous_commit:
+                    await self._write_embeddings(conn, records)
+                else:
+                    async with conn.transaction():
+                        await conn.execute("SET LOCAL synchronous_commit TO off")
+                        await self._write_embeddings(conn, records)
+                
+                logger.info(f"Stored {len(records)} embeddings")
                 return True
                 
         except Exception as e:
             logger.error(f"Error storing embeddings: {e}")
             return False
     
-    async def search(self, query_embedding: List[float], 
+    @asynccontextmanager
+    async def transaction(self, synchronous_commit: bool = True):
+        """Pooled connection in a transaction, for writes that must commit together
+        
+        The connection can also be used by MetadataStore, which shares the
+        database, so a document's vectors and metadata commit at once.
+        """
+        if self.pool is None:
+            await self.connect()
+        
+        async with self.pool.acquire() as conn, conn.transaction():
+            if not synchronous_commit:
+                await conn.execute("SET LOCAL synchronous_commit TO off")
+            yield conn
+    
+    async def write_embeddings(self, conn, embeddings: Union[np.ndarray, List[List[float]]],
+                               chunks: List[DocumentChunk]):
+        """Store embeddings on a connection from transaction(), raising on failure"""
+        records = self._records(embeddings, chunks)
+        await self._write_embeddings(conn, records)
+        logger.info(f"Wrote {len(records)} embeddings")
+    
+    @staticmethod
+    def _records(embeddings: Union[np.ndarray, List[List[float]]],
+                 chunks: List[DocumentChunk]) -> List[tuple]:
+        """Rows for the embeddings table"""
+        # One contiguous float32 block (a no-op for the embedder's output),
+        # so each row is encoded from a view rather than boxed Python floats
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return [
+            (chunk.content, embedding, chunk.metadata,
+             chunk.source_file, chunk.chunk_index)
+            for embedding, chunk in zip(embeddings, chunks)
+        ]
+    
+    async def _write_embeddings(self, conn, records: List[tuple]):
+        """Insert embedding rows, with COPY for large batches"""
+        if len(records) >= self.copy_min_rows:
+            # Bulk load over the COPY protocol instead of one INSERT per row
+            await conn.copy_records_to_table(
+                'embeddings',
+                records=records,
+                columns=['content', 'embedding', 'metadata', 'source_file', 'chunk_index']
+            )
+        else:
+            await conn.executemany("""
+                INSERT INTO embeddings (content, embedding, metadata, source_file, chunk_index)
+                VALUES ($1, $2, $3, $4, $5)
+            """, records)
+    
+    async def write_bulk_embeddings(self, conn, embeddings: Union[np.ndarray, List[List[float]]],
+                                    chunks: List[DocumentChunk],
+                                    batch_size: Optional[int] = None):
+        """Store embeddings for the chunks of many documents in fixed-size slices
+        
+        Slices are written on a connection from transaction(), so they commit
+        together, and are bulk_batch_rows long unless batch_size is given.
+        Raises on failure.
+        """
+        if self.db_config.bulk_store_tune:
+            await self.tune_bulk_store()
+        batch_size = batch_size or self.bulk_batch_rows
+        
+        # Write rows in (source_file, chunk_index) order, so each document's rows
+        # land on adjacent heap pages
+        order = sorted(range(len(chunks)), key=lambda i: (chunks[i].source_file, chunks[i].chunk_index))
+        embeddings = np.asarray(embeddings, dtype=np.float32)[order]
+        chunks = [chunks[i] for i in order]
+        
+        for start in range(0, len(chunks), batch_size):
+            await self.write_embeddings(
+                conn, embeddings[start:start + batch_size], chunks[start:start + batch_size]
+            )
+    
+    async def tune_bulk_store(self, dimension: int = 1536):
+        """Pick copy_min_rows and bulk_batch_rows from measured write costs
+        
+        Random unit vectors are written in slices of each TUNE_BATCH_SIZES size,
+        with COPY and with executemany, into a temporary copy of the embeddings
+        table (with its indexes) that is rolled back afterwards. COPY is used
+        from the smallest size where it is no slower per row, and bulk writes
+        use the size with the lowest cost per row. Runs once per database per
+        process; on failure the defaults are kept.
+        """
+        key = (self.db_config.host, self.db_config.port, self.db_config.database, dimension)
+        if key not in _tuned:
+            try:
+                if self.pool is None:
+                    await self.connect()
+                
+                vectors = np.random.default_rng(0).standard_normal((TUNE_PROBE_ROWS, dimension), dtype=np.float32)
+                vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                records = [(f"probe {i}", vector, {}, "probe", i) for i, vector in enumerate(vectors)]
+                copy_cost, insert_cost = {}, {}
+                
+                async with self.pool.acquire() as conn:
+                    transaction = conn.transaction()
+                    await transaction.start()
+                    try:
+                        await conn.execute("""
+                            CREATE TEMP TABLE embeddings_probe
+                            (LIKE embeddings INCLUDING DEFAULTS INCLUDING INDEXES)
+                            ON COMMIT DROP
+                        """)
+                        
+                        async def copy(batch):
+                            await conn.copy_records_to_table(
+                                'embeddings_probe',
+                                records=batch,
+                                columns=['content', 'embedding', 'metadata', 'source_file', 'chunk_index']
+                            )
+                        
+                        async def insert(batch):
+                            await conn.executemany("""
+                                INSERT INTO embeddings_probe (content, embedding, metadata, source_file, chunk_index)
+                                VALUES ($1, $2, $3, $4, $5)
+                            """, batch)
+                        
+                        for size in TUNE_BATCH_SIZES:
+                            copy_cost[size] = await _seconds_per_row(copy, records, size)
+                            insert_cost[size] = await _seconds_per_row(insert, records, size)
+                    finally:
+                        await transaction.rollback()
+                
+                # If COPY never wins, keep it for slices larger than any tried
+                copy_min_rows = next(
+                    (size for size in TUNE_BATCH_SIZES if copy_cost[size] <= insert_cost[size]),
+                    TUNE_BATCH_SIZES[-1] + 1
+                )
+                bulk_batch_rows = min(
+                    TUNE_BATCH_SIZES,
+                    key=lambda size: copy_cost[size] if size >= copy_min_rows else insert_cost[size]
+                )
+                _tuned[key] = (copy_min_rows, bulk_batch_rows)
+                logger.info(f"Tuned bulk store: COPY from {copy_min_rows} rows, "
+                            f"slices of {bulk_batch_rows} rows")
+                
+            except Exception as e:
+                logger.warning(f"Error tuning bulk store, keeping defaults: {e}")
+                _tuned[key] = (self.copy_min_rows, self.bulk_batch_rows)
+        
+        self.copy_min_rows, self.bulk_batch_rows = _tuned[key]
+    
+    async def search(self, query_embedding: Union[np.ndarray, List[float]], 
                     limit: int = 10, 
-                    similarity_threshold: float = 0.7) -> List[SearchResult]:
+                    similarity_threshold: float = 0.7,
+                    ef_search: Optional[int] = None) -> List[SearchResult]:
         """Search for similar embeddings"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
             
-            async with self.pool.acquire() as conn:
-                # Perform similarity search
-                rows = await conn.fetch("""
+            # Sent as the vector's raw float32 bytes; a no-op for the embedder's output
+            query_embedding = np.asarray(query_embedding, dtype=np.float32)
+            
+            async with self.pool.acquire() as conn, conn.transaction():
+                if self.db_config.vector_index == "hnsw":
+                    # Candidate list size for this transaction only (SET LOCAL). An
+                    # HNSW scan returns at most ef_search rows, so it is at least limit
+                    await conn.execute(
+                        "SELECT set_config('hnsw.ef_search', $1, true)",
+                        str(max(ef_search or self.db_config.hnsw_ef_search, limit))
+                    )
+                
+                # Perform similarity search. The threshold is applied below rather
+                # than in a WHERE clause, which would filter the index scan's output
+                # anyway and compute every distance twice
+                rows = await conn.fetch(f"""
                     SELECT content, metadata, source_file, chunk_index,
                            1 - (embedding <=> $1) as similarity
                     FROM embeddings
-                    WHERE 1 - (embedding <=> $1) > $2
-                    ORDER BY embedding <=> $1
-                    LIMIT $3
-                """, query_embedding, similarity_threshold, limit)
+                    ORDER BY {self.index_distance}
+                    LIMIT $2
+                """, query_embedding, limit)
                 
                 results = []
                 for row in rows:
+                    # Not a break: with a float16 index the ranking is by half-precision
+                    # distance, so the exact similarities are not strictly descending
+                    if row['similarity'] <= similarity_threshold:
+                        continue
                     result = SearchResult(
                         content=row['content'],
                         metadata=row['metadata'],
@@ -156,51 +356,65 @@ class VectorStore:
             logger.error(f"Error searching embeddings: {e}")
             return []
     
-    async def search_with_metadata(self, query_embedding: List[float],
+    async def search_with_metadata(self, query_embedding: Union[np.ndarray, List[float]],
                                  metadata_filter: Dict[str, Any],
                                  limit: int = 10) -> List[SearchResult]:
         """Search with metadata filtering"""
         try:
-            await self.connect()
-            
-            # Build metadata filter query
-            filter_conditions = []
-            filter_values = [query_embedding]
-            param_count = 1
-            
-            for key, value in metadata_filter.items():
-                filter_conditions.append(f"metadata->>'{key}' = ${param_count + 1}")
-                filter_values.append(str(value))
-                param_count += 1
+            if self.pool is None:
+                await self.connect()
             
-            filter_clause = " AND ".join(filter_conditions) if filter_conditions else "TRUE"
+            # Sent as the vector's raw float32 bytes; a no-op for the embedder's output
+            query_embedding = np.asarray(query_embedding, dtype=np.float32)
             
-            async with self.pool.acquire() as conn:
-                query = f"""
+            # Filter keys and values are bound, never formatted into the SQL,
+            # so each query text is constant and its prepared plan is reused
+            if metadata_filter:
+                # Filter first through the GIN index on metadata, then rank the
+                # matches exactly. Filtering the ANN index scan instead would drop
+                # matches the index did not return, losing results on selective filters
+                rows = await self.pool.fetch("""
+                    WITH candidates AS MATERIALIZED (
+                        SELECT content, metadata, source_file, chunk_index, embedding
+                        FROM embeddings
+                        WHERE metadata @> $2::jsonb
+                    )
                     SELECT content, metadata, source_file, chunk_index,
                            1 - (embedding <=> $1) as similarity
-                    FROM embeddings
-                    WHERE {filter_clause}
+                    FROM candidates
                     ORDER BY embedding <=> $1
-                    LIMIT ${param_count + 1}
-                """
-                filter_values.append(limit)
-                
-                rows = await conn.fetch(query, *filter_values)
-                
-                results = []
-                for row in rows:
-                    result = SearchResult(
-                        content=row['content'],
-                        metadata=row['metadata'],
-                        source_file=row['source_file'],
-                        chunk_index=row['chunk_index'],
-                        similarity=row['similarity']
-                    )
-                    results.append(result)
-                
-                return results
-                
+                    LIMIT $3
+                """, query_embedding, metadata_filter, limit)
+            else:
+                async with self.pool.acquire() as conn, conn.transaction():
+                    if self.db_config.vector_index == "hnsw":
+                        # As in search(): an HNSW scan returns at most ef_search rows
+                        await conn.execute(
+                            "SELECT set_config('hnsw.ef_search', $1, true)",
+                            str(max(self.db_config.hnsw_ef_search, limit))
+                        )
+                    
+                    rows = await conn.fetch(f"""
+                        SELECT content, metadata, source_file, chunk_index,
+                               1 - (embedding <=> $1) as similarity
+                        FROM embeddings
+                        ORDER BY {self.index_distance}
+                        LIMIT $2
+                    """, query_embedding, limit)
+            
+            results = []
+            for row in rows:
+                result = SearchResult(
+                    content=row['content'],
+                    metadata=row['metadata'],
+                    source_file=row['source_file'],
+                    chunk_index=row['chunk_index'],
+                    similarity=row['similarity']
+                )
+                results.append(result)
+            
+            return results
+            
         except Exception as e:
             logger.error(f"Error searching with metadata: {e}")
             return []
@@ -208,16 +422,16 @@ class VectorStore:
     async def delete_by_source(self, source_file: str) -> bool:
         """Delete all embeddings for a specific source file"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
+            
+            result = await self.pool.execute("""
+                DELETE FROM embeddings WHERE source_file = $1
+            """, source_file)
+            
+            logger.info(f"Deleted embeddings for {source_file}")
+            return True
             
-            async with self.pool.acquire() as conn:
-                result = await conn.execute("""
-                    DELETE FROM embeddings WHERE source_file = $1
-                """, source_file)
-                
-                logger.info(f"Deleted embeddings for {source_file}")
-                return True
-                
         except Exception as e:
             logger.error(f"Error deleting embeddings: {e}")
             return False
@@ -225,28 +439,18 @@ class VectorStore:
     async def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics"""
         try:
-            await self.connect()
+            if self.pool is None:
+                await self.connect()
+            
+            # Total embeddings and unique source files in one scan
+            row = await self.pool.fetchrow("""
+                SELECT COUNT(*) AS total_embeddings,
+                       COUNT(DISTINCT source_file) AS unique_sources
+                FROM embeddings
+            """)
+            
+            return dict(row)
             
-            async with self.pool.acquire() as conn:
-                # Total embeddings
-                total_count = await conn.fetchval("SELECT COUNT(*) FROM embeddings")
-                
-                # Unique source files
-                source_count = await conn.fetchval("""
-                    SELECT COUNT(DISTINCT source_file) FROM embeddings
-                """)
-                
-                # Average similarity score
-                avg_similarity = await conn.fetchval("""
-                    SELECT AVG(1 - (embedding <=> embedding)) FROM embeddings
-                """)
-                
-                return {
-                    "total_embeddings": total_count,
-                    "unique_sources": source_count,
-                    "avg_similarity": float(avg_similarity) if avg_similarity else 0.0
-                }
-                
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             return {} 
\ No newline at end of file
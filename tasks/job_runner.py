@@ -3,21 +3,152 @@ Celery job runner for async task processing
 """
 
 import asyncio
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import logging
-from celery import Celery
-from celery.result import AsyncResult
+import threading
+import time
+import weakref
+import asyncpg
+import httpx
+import numpy as np
+from celery import Celery, group
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery import states
+from celery.backends.base import KeyValueStoreBackend
+from celery.result import AsyncResult, GroupResult
+from kombu.serialization import register
+from pydantic import TypeAdapter
 import json
+import orjson
+
+try:
+    import openai
+except ImportError:  # only needed for the OpenAI provider
+    openai = None
 
 from config import Config
+from ingestion.base_loader import BaseLoader
 from ingestion.pdf_loader import PDFLoader
 from ingestion.email_loader import EmailLoader
+from ingestion.cache import ChunkCache
+from ingestion.utils import prefetch_files
 from embeddings.embedder import Embedder
+from embeddings.http import close_http_client, reset_http_client
 from storage.vector_store import VectorStore
 from storage.metadata_store import MetadataStore
+from storage.pool import close_pools
+from storage.schemas import DocumentChunk, SearchResult
 
 logger = logging.getLogger(__name__)
 
+# Seconds worker inspection replies are reused; every inspect broadcast waits up
+# to its reply timeout, so dashboards polling stats would otherwise stall on it
+INSPECT_CACHE_TTL = 5.0
+
+# Files per task published by batch_process. Fewer messages to publish and
+# acknowledge, while each task still loads and embeds its files concurrently
+BATCH_PROCESS_CHUNK_FILES = 16
+
+# Errors a document task is retried for, with exponential backoff, when the
+# database or embedding provider is briefly unreachable. Provider SDK and
+# httpx errors do not derive from the built-in connection errors. Not OSError,
+# whose missing or unreadable files would be retried for nothing
+RETRYABLE_ERRORS = (
+    ConnectionError, TimeoutError, asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError, asyncpg.InterfaceError,
+    httpx.TransportError,
+) + ((openai.APIConnectionError,) if openai is not None else ())
+
+# Embedded windows of a document waiting to be stored, bounding the vectors
+# held in memory when the database falls behind the provider
+PIPELINE_QUEUE_SIZE = 2
+
+# Serializes a whole result list in one call into pydantic's core, instead of
+# dumping each model from Python
+_SEARCH_RESULTS = TypeAdapter(List[SearchResult])
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    """Encode a task message or result, coercing non-string dict keys like json does"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Much faster than kombu's stdlib json encoder on large argument lists, e.g.
+# the file paths of bulk_process
+register('orjson', _orjson_dumps, orjson.loads,
+         content_type='application/x-orjson', content_encoding='utf-8')
+
+# Event loop shared by every task in a worker process, run on its own thread so
+# that tasks of a threads pool (celery worker -P threads) overlap their awaits.
+# The database pools and embedding HTTP client persist across tasks
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_thread: Optional[threading.Thread] = None
+_worker_loop_lock = threading.Lock()
+
+# Runners created in this process, whose components each worker rebuilds
+_runners: "weakref.WeakSet[JobRunner]" = weakref.WeakSet()
+
+
+def _start_worker_loop():
+    """Start a new event loop for this process on a daemon thread"""
+    global _worker_loop, _worker_thread
+    _worker_loop = asyncio.new_event_loop()
+    _worker_thread = threading.Thread(
+        target=_worker_loop.run_forever, name='gabo-worker-loop', daemon=True
+    )
+    _worker_thread.start()
+
+
+@worker_process_init.connect
+def _init_worker(**kwargs):
+    """Give each forked worker process its own event loop and components"""
+    global _worker_loop_lock
+    # The parent's loop thread does not survive the fork
+    _worker_loop_lock = threading.Lock()
+    _start_worker_loop()
+    # Components inherited from the parent hold clients (HTTP, the SQLite
+    # embedding cache) that must not be shared across processes
+    reset_http_client()
+    for runner in _runners:
+        runner._create_components()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker(**kwargs):
+    """Flush the worker's embedders and close its pooled connections"""
+    for runner in _runners:
+        _run(runner.embedder.close())
+    _run(close_pools())
+    _run(close_http_client())
+
+
+def _run(coro):
+    """Run a coroutine on this process's event loop and wait for its result
+    
+    Callable from several task threads at once; their coroutines interleave
+    on the one loop.
+    """
+    with _worker_loop_lock:
+        # Started on first use outside prefork workers (solo and threads pools,
+        # eager tasks), or again in a child forked from a process that had one
+        if _worker_thread is None or not _worker_thread.is_alive():
+            _start_worker_loop()
+        loop = _worker_loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def _get_loader(file_path: str, file_type: Optional[str] = None) -> BaseLoader:
+    """Pick the loader for a file from its declared type or extension"""
+    if file_type == "pdf" or file_path.lower().endswith('.pdf'):
+        # Prefork children are daemonic and run an event-loop thread, so they
+        # must not start a page-splitting process pool of their own
+        return PDFLoader(split_pages=False)
+    elif file_type == "email" or file_path.lower().endswith('.eml'):
+        return EmailLoader()
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
 
 class JobRunner:
     """Celery job runner for processing documents"""
@@ -35,82 +166,88 @@ class JobRunner:
             task_serializer=config.task.task_serializer,
             result_serializer=config.task.result_serializer,
             accept_content=config.task.accept_content,
+            result_accept_content=config.task.accept_content,
+            task_compression=config.task.task_compression,
             timezone='UTC',
             enable_utc=True,
         )
         
-        # Initialize components
-        self.embedder = Embedder(config)
-        self.vector_store = VectorStore(config)
-        self.metadata_store = MetadataStore(config)
+        # Initialize components, once per process; tasks share them
+        self._create_components()
+        self.chunk_cache = ChunkCache(config.storage.chunk_cache_dir) if config.storage.chunk_cache_dir else None
+        self._inspected: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+        _runners.add(self)
         
         # Register tasks
         self._register_tasks()
     
+    def _create_components(self):
+        """Create the embedder and stores used by tasks"""
+        self.embedder = Embedder(self.config)
+        self.vector_store = VectorStore(self.config)
+        self.metadata_store = MetadataStore(self.config)
+        # Documents that hold a connection across embedding windows; the rest
+        # of the pool stays free for other tasks and searches
+        self._writers = asyncio.Semaphore(max(1, self.config.database.pool_max_size // 2))
+    
     def _register_tasks(self):
         """Register Celery tasks"""
+        # Bound tasks receive the Celery task as `self`, so the runner is captured here
+        runner = self
+        chunk_cache = self.chunk_cache
+        chunk_hash = self.config.storage.chunk_hash
         
-        @self.celery.task(bind=True, name='process_document')
+        @self.celery.task(bind=True, name='process_document', autoretry_for=RETRYABLE_ERRORS,
+                          retry_backoff=2, retry_backoff_max=600, retry_jitter=True, max_retries=5)
         def process_document_task(self, file_path: str, file_type: Optional[str] = None):
             """Process a single document"""
-            try:
+            task_id = self.request.id
+            
+            async def progress(status: str):
+                # The request context is thread-local and unset on the worker loop's
+                # thread, so the id is passed; the blocking backend write runs off it
+                await asyncio.get_running_loop().run_in_executor(None, lambda: self.update_state(
+                    task_id=task_id, state='PROGRESS', meta={'status': status, 'file': file_path}
+                ))
+            
+            async def process():
                 # Update task status
-                self.update_state(
-                    state='PROGRESS',
-                    meta={'status': 'Processing document', 'file': file_path}
-                )
-                
-                # Determine loader
-                if file_type == "pdf" or file_path.lower().endswith('.pdf'):
-                    loader = PDFLoader()
-                elif file_type == "email" or file_path.lower().endswith('.eml'):
-                    loader = EmailLoader()
-                else:
-                    raise ValueError(f"Unsupported file type: {file_type}")
+                await progress('Processing document')
                 
                 # Load and chunk document
-                chunks = asyncio.run(loader.load_and_chunk(file_path))
-                
-                # Update progress
-                self.update_state(
-                    state='PROGRESS',
-                    meta={'status': 'Generating embeddings', 'file': file_path}
-                )
-                
-                # Generate embeddings
-                embeddings = asyncio.run(self.embedder.embed_chunks([c.content for c in chunks]))
+                loader = _get_loader(file_path, file_type)
+                loader.chunk_cache = chunk_cache
+                loader.chunk_hash = chunk_hash
+                chunks = await loader.load_and_chunk(file_path)
                 
                 # Update progress
-                self.update_state(
-                    state='PROGRESS',
-                    meta={'status': 'Storing data', 'file': file_path}
-                )
-                
-                # Store in vector database
-                asyncio.run(self.vector_store.store_embeddings(embeddings, chunks))
+                await progress('Generating embeddings')
                 
-                # Store metadata
-                asyncio.run(self.metadata_store.store_metadata(chunks))
-                
-                # Update processing status
-                asyncio.run(self.metadata_store.update_processing_status(
-                    file_path, "completed", "Document processed successfully"
-                ))
+                # Generate embeddings, storing each window's vectors as it is ready;
+                # the same transaction stores the metadata and marks the document completed
+                embedded = await runner.embed_and_store(chunks, "Document processed successfully")
                 
                 return {
                     'status': 'SUCCESS',
                     'file': file_path,
                     'chunks_processed': len(chunks),
-                    'embeddings_created': len(embeddings)
+                    'embeddings_created': embedded
                 }
+            
+            try:
+                return _run(process())
                 
             except Exception as e:
                 logger.error(f"Error processing document {file_path}: {e}")
                 
-                # Update processing status
-                asyncio.run(self.metadata_store.update_processing_status(
-                    file_path, "failed", str(e)
-                ))
+                # Retryable errors are raised again by autoretry_for; the document
+                # only fails once no retry is left. A retry starts over safely, as
+                # nothing of the document is committed before embed_and_store's
+                # single transaction
+                if not isinstance(e, RETRYABLE_ERRORS) or self.request.retries >= self.max_retries:
+                    _run(runner.metadata_store.update_processing_status(
+                        file_path, "failed", str(e)
+                    ))
                 
                 raise
         
@@ -118,48 +255,70 @@ class JobRunner:
         def batch_process_task(self, file_paths: List[str]):
             """Process multiple documents in batch"""
             try:
-                results = []
                 total_files = len(file_paths)
                 
-                for i, file_path in enumerate(file_paths):
-                    # Update progress
-                    self.update_state(
-                        state='PROGRESS',
-                        meta={
-                            'status': f'Processing file {i+1}/{total_files}',
-                            'current_file': file_path,
-                            'progress': (i / total_files) * 100
-                        }
-                    )
-                    
-                    # Process individual file
-                    result = process_document_task.delay(file_path)
-                    results.append(result)
+                # Update progress
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'status': f'Dispatching {total_files} files',
+                        'progress': 0
+                    }
+                )
+                
+                # Publish one bulk_process task per slice of files, as one group;
+                # each still processes its files concurrently on the worker
+                group_result = group(
+                    bulk_process_task.s(file_paths[start:start + BATCH_PROCESS_CHUNK_FILES])
+                    for start in range(0, total_files, BATCH_PROCESS_CHUNK_FILES)
+                ).apply_async()
+                # Saved so get_group_status can restore it from the id alone
+                group_result.save()
                 
                 return {
                     'status': 'SUCCESS',
                     'total_files': total_files,
-                    'task_ids': [r.id for r in results]
+                    'group_id': group_result.id,
+                    'task_ids': [r.id for r in group_result.results]
                 }
                 
             except Exception as e:
                 logger.error(f"Error in batch processing: {e}")
                 raise
         
+        @self.celery.task(bind=True, name='bulk_process')
+        def bulk_process_task(self, file_paths: List[str]):
+            """Process many documents in this task, embedding their chunks together"""
+            try:
+                self.update_state(
+                    state='PROGRESS',
+                    meta={'status': f'Processing {len(file_paths)} files'}
+                )
+                
+                statuses = _run(runner.bulk_process_documents(file_paths))
+                failed = [path for path, status in statuses.items() if status != "completed"]
+                
+                return {
+                    'status': 'SUCCESS',
+                    'total_files': len(file_paths),
+                    'files_processed': len(file_paths) - len(failed),
+                    'failed_files': failed
+                }
+                
+            except Exception as e:
+                logger.error(f"Error in bulk processing: {e}")
+                raise
+        
         @self.celery.task(bind=True, name='search_documents')
         def search_documents_task(self, query: str, limit: int = 10):
             """Search documents with query"""
             try:
-                # Generate query embedding
-                query_embedding = asyncio.run(self.embedder.embed_query(query))
-                
-                # Search vector store
-                results = asyncio.run(self.vector_store.search(query_embedding, limit))
+                results = runner.search(query, limit)
                 
                 return {
                     'status': 'SUCCESS',
                     'query': query,
-                    'results': [r.dict() for r in results],
+                    'results': results,
                     'total_results': len(results)
                 }
                 
@@ -182,46 +341,273 @@ class JobRunner:
             except Exception as e:
                 logger.error(f"Error cleaning up data: {e}")
                 raise
+        
+        # Submitted through the task objects, which carry their own options,
+        # rather than by name through send_task
+        self._process_document_task = process_document_task
+        self._batch_process_task = batch_process_task
+        self._bulk_process_task = bulk_process_task
+        self._search_documents_task = search_documents_task
+        self._cleanup_old_data_task = cleanup_old_data_task
+    
+    async def embed_and_store(self, chunks: List[DocumentChunk], message: Optional[str] = None) -> int:
+        """Embed a document's chunks and store them, pipelined by window
+        
+        Chunks are embedded a window (one round of concurrent provider batches)
+        at a time, and each window's vectors are written while the next one is
+        embedded, so long documents keep the provider and the database busy at
+        once. The vectors, the chunk metadata and the completed status (logged
+        with message, if given) are written in one transaction, so a failed
+        embedding or write leaves nothing of the document behind. Returns the
+        number of embeddings created.
+        """
+        window = self.config.embedding.batch_size * self.config.embedding.concurrency
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        
+        async def embed() -> int:
+            count = 0
+            try:
+                for start in range(0, len(chunks), window):
+                    window_chunks = chunks[start:start + window]
+                    embeddings = await self.embedder.embed_chunks([c.content for c in window_chunks])
+                    count += len(embeddings)
+                    await embedded.put((embeddings, window_chunks))
+            except Exception as e:
+                # Raised by the writer instead, inside its transaction, to roll it back
+                await embedded.put(e)
+            else:
+                await embedded.put(None)
+            return count
+        
+        async def store():
+            # The connection is taken once the first window is embedded, so it is
+            # not held through the provider's latency before there is anything to write
+            item = await embedded.get()
+            if isinstance(item, Exception):
+                raise item
+            async with self._writers, self.vector_store.transaction() as conn:
+                while item is not None:
+                    if isinstance(item, Exception):
+                        raise item
+                    await self.vector_store.write_embeddings(conn, *item)
+                    item = await embedded.get()
+                await self.metadata_store.write_document(conn, chunks, message)
+        
+        embedding = asyncio.ensure_future(embed())
+        try:
+            await store()
+        except BaseException:
+            # The embedder may be waiting on a full queue that is no longer read
+            embedding.cancel()
+            raise
+        return await embedding
+    
+    async def bulk_process_documents(self, file_paths: List[str]) -> Dict[str, str]:
+        """Process documents with their chunks pooled into shared embedding batches
+        
+        Documents load concurrently. Their chunks are queued until they fill an
+        embedding batch, so many small documents share provider calls instead of
+        costing at least one each. Returns the processing status of each path.
+        """
+        statuses = {path: "failed" for path in file_paths}
+        batch_size = self.config.embedding.batch_size
+        
+        async def load(path: str) -> Tuple[str, Optional[List[DocumentChunk]]]:
+            try:
+                loader = _get_loader(path)
+                loader.chunk_cache = self.chunk_cache
+                loader.chunk_hash = self.config.storage.chunk_hash
+                return path, await loader.load_and_chunk(path)
+            except Exception as e:
+                logger.error(f"Error loading {path}: {e}")
+                await self.metadata_store.update_processing_status(path, "failed", str(e))
+                return path, None
+        
+        async def flush(documents: List[Tuple[str, List[DocumentChunk]]]):
+            all_chunks = [chunk for _, chunks in documents for chunk in chunks]
+            try:
+                embeddings = await self.embedder.embed_chunks([chunk.content for chunk in all_chunks])
+            except Exception as e:
+                if len(documents) == 1:
+                    path = documents[0][0]
+                    logger.error(f"Error embedding {path}: {e}")
+                    await self.metadata_store.update_processing_status(path, "failed", str(e))
+                    return
+                # Retry each document alone, so one bad document fails by itself
+                for document in documents:
+                    await flush([document])
+                return
+            
+            await store(documents, embeddings)
+        
+        async def store(documents: List[Tuple[str, List[DocumentChunk]]], embeddings: np.ndarray):
+            all_chunks = [chunk for _, chunks in documents for chunk in chunks]
+            try:
+                # The batch's vectors, chunk metadata and completed statuses commit
+                # together, so a failed write leaves nothing of any document behind
+                async with self.vector_store.transaction(
+                    synchronous_commit=self.config.database.bulk_synchronous_commit
+                ) as conn:
+                    await self.vector_store.write_bulk_embeddings(conn, embeddings, all_chunks)
+                    for _, chunks in documents:
+                        await self.metadata_store.write_document(conn, chunks, "Document processed successfully")
+            except Exception as e:
+                if len(documents) == 1:
+                    path = documents[0][0]
+                    logger.error(f"Error storing {path}: {e}")
+                    await self.metadata_store.update_processing_status(path, "failed", str(e))
+                    return
+                # Retry each document alone with its own vectors, so one bad
+                # document fails by itself
+                start = 0
+                for document in documents:
+                    await store([document], embeddings[start:start + len(document[1])])
+                    start += len(document[1])
+                return
+            
+            for path, _ in documents:
+                statuses[path] = "completed"
+        
+        # Every file is loaded at once, so all their reads are queued up front
+        prefetch_files(file_paths)
+        
+        pending: List[Tuple[str, List[DocumentChunk]]] = []
+        pending_chunks = 0
+        for loaded in asyncio.as_completed([load(path) for path in file_paths]):
+            path, chunks = await loaded
+            if chunks is None:
+                continue
+            pending.append((path, chunks))
+            pending_chunks += len(chunks)
+            if pending_chunks >= batch_size:
+                await flush(pending)
+                pending, pending_chunks = [], 0
+        if pending:
+            await flush(pending)
+        
+        return statuses
     
     def process_document(self, file_path: str, file_type: Optional[str] = None) -> AsyncResult:
         """Submit document processing task"""
-        return self.celery.send_task('process_document', args=[file_path, file_type])
+        return self._process_document_task.apply_async(args=(file_path, file_type))
     
     def batch_process(self, file_paths: List[str]) -> AsyncResult:
         """Submit batch processing task"""
-        return self.celery.send_task('batch_process', args=[file_paths])
+        return self._batch_process_task.apply_async(args=(file_paths,))
+    
+    def bulk_process(self, file_paths: List[str]) -> AsyncResult:
+        """Submit bulk processing task, which embeds the files' chunks together"""
+        return self._bulk_process_task.apply_async(args=(file_paths,))
     
     def search_documents(self, query: str, limit: int = 10) -> AsyncResult:
         """Submit search task"""
-        return self.celery.send_task('search_documents', args=[query, limit])
+        return self._search_documents_task.apply_async(args=(query, limit))
+    
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search documents in this process, without a broker round-trip
+        
+        For interactive queries: one embedding and one vector search, with
+        this runner's embedder and stores on the process's event loop.
+        """
+        async def search():
+            # Generate query embedding
+            query_embedding = await self.embedder.embed_query(query)
+            
+            # Search vector store
+            return await self.vector_store.search(query_embedding, limit)
+        
+        return _SEARCH_RESULTS.dump_python(_run(search()))
     
     def cleanup_old_data(self, days_old: int = 30) -> AsyncResult:
         """Submit cleanup task"""
-        return self.celery.send_task('cleanup_old_data', args=[days_old])
+        return self._cleanup_old_data_task.apply_async(args=(days_old,))
     
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get status of a task"""
-        result = AsyncResult(task_id, app=self.celery)
+        # One backend read for all fields; AsyncResult's status, ready(), result
+        # and info each re-read the meta until the task is done. The backend
+        # caches the meta of finished tasks
+        meta = self.celery.backend.get_task_meta(task_id)
         return {
             'task_id': task_id,
-            'status': result.status,
-            'result': result.result if result.ready() else None,
-            'info': result.info if hasattr(result, 'info') else None
+            'status': meta['status'],
+            'result': meta['result'] if meta['status'] in states.READY_STATES else None,
+            'info': meta['result']
         }
     
+    def get_group_status(self, group_id: str) -> Dict[str, Any]:
+        """Get the status of every task in a group saved by batch_process
+        
+        Key-value result backends (e.g. Redis) return every task's state in
+        one MGET, instead of one backend read per task id.
+        """
+        group_result = GroupResult.restore(group_id, app=self.celery)
+        if group_result is None:
+            return {'group_id': group_id, 'status': 'UNKNOWN', 'tasks': []}
+        
+        task_ids = [result.id for result in group_result.results]
+        backend = self.celery.backend
+        if isinstance(backend, KeyValueStoreBackend):
+            values = backend.mget([backend.get_key_for_task(task_id) for task_id in task_ids])
+            metas = [
+                backend.decode_result(value) if value else {'status': states.PENDING, 'result': None}
+                for value in values
+            ]
+        else:
+            metas = [{'status': result.state, 'result': result.result} for result in group_result.results]
+        
+        tasks = [
+            {
+                'task_id': task_id,
+                'status': meta['status'],
+                'result': meta['result'] if meta['status'] == states.SUCCESS else None,
+                'error': str(meta['result']) if meta['status'] in states.EXCEPTION_STATES else None
+            }
+            for task_id, meta in zip(task_ids, metas)
+        ]
+        completed = sum(task['status'] in states.READY_STATES for task in tasks)
+        return {
+            'group_id': group_id,
+            'status': 'SUCCESS' if completed == len(tasks) else 'PROGRESS',
+            'completed': completed,
+            'total': len(tasks),
+            'tasks': tasks
+        }
+    
+    def inspect_workers(self) -> Dict[str, Any]:
+        """Get the stats, active, reserved and scheduled tasks of every worker
+        
+        The four inspect broadcasts run concurrently rather than each waiting
+        out its reply timeout in turn, and the replies are reused for
+        INSPECT_CACHE_TTL seconds.
+        """
+        checked_at, cached = self._inspected
+        if cached is not None and time.monotonic() - checked_at < INSPECT_CACHE_TTL:
+            return cached
+        
+        inspect = self.celery.control.inspect()
+        calls = {
+            'stats': inspect.stats,
+            'active': inspect.active,
+            'reserved': inspect.reserved,
+            'scheduled': inspect.scheduled
+        }
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = {name: executor.submit(call) for name, call in calls.items()}
+            replies = {name: future.result() for name, future in futures.items()}
+        
+        self._inspected = (time.monotonic(), replies)
+        return replies
+    
     def get_worker_stats(self) -> Dict[str, Any]:
         """Get worker statistics"""
         try:
-            inspect = self.celery.control.inspect()
-            
-            stats = inspect.stats()
-            active_tasks = inspect.active()
-            reserved_tasks = inspect.reserved()
+            replies = self.inspect_workers()
             
             return {
-                'stats': stats,
-                'active_tasks': active_tasks,
-                'reserved_tasks': reserved_tasks
+                'stats': replies['stats'],
+                'active_tasks': replies['active'],
+                'reserved_tasks': replies['reserved']
             }
         except Exception as e:
             logger.error(f"Error getting worker stats: {e}")
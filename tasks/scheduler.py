@@ -62,21 +62,6 @@ class Scheduler:
                 logger.error(f"Health check failed: {e}")
                 raise
         
-        @self.celery.task(name='retry_failed_tasks')
-        def retry_failed_tasks():
-            """Retry failed tasks"""
-            try:
-                # Get failed tasks from database
-                # Retry them with exponential backoff
-                
-                return {
-                    'status': 'completed',
-                    'retried_tasks': 0
-                }
-            except Exception as e:
-                logger.error(f"Error retrying failed tasks: {e}")
-                raise
-        
         # Configure periodic schedule
         self.celery.conf.beat_schedule = {
             'cleanup-old-data': {
@@ -87,26 +72,15 @@ class Scheduler:
                 'task': 'health_check',
                 'schedule': crontab(minute='*/15'),  # Every 15 minutes
             },
-            'retry-failed-tasks': {
-                'task': 'retry_failed_tasks',
-                'schedule': crontab(minute='*/5'),  # Every 5 minutes
-            },
         }
     
     def schedule_document_processing(self, file_paths: List[str], 
                                    priority: str = 'normal') -> str:
-        """Schedule document processing with retry logic"""
+        """Schedule document processing"""
         try:
             # Submit batch processing task
             task = self.job_runner.batch_process(file_paths)
             
-            # Configure retry logic
-            task.retry(
-                countdown=60,  # Wait 1 minute before first retry
-                max_retries=3,
-                exc=Exception
-            )
-            
             logger.info(f"Scheduled processing for {len(file_paths)} files: {task.id}")
             return task.id
             
@@ -114,8 +88,17 @@ class Scheduler:
             logger.error(f"Error scheduling document processing: {e}")
             raise
     
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search documents inline, for interactive queries"""
+        try:
+            return self.job_runner.search(query, limit)
+            
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}")
+            raise
+    
     def schedule_search(self, query: str, limit: int = 10) -> str:
-        """Schedule search task"""
+        """Schedule search task, for callers that want a task id to poll"""
         try:
             task = self.job_runner.search_documents(query, limit)
             logger.info(f"Scheduled search for query: {query}")
@@ -139,8 +122,8 @@ class Scheduler:
     def get_scheduled_tasks(self) -> List[Dict[str, Any]]:
         """Get list of scheduled tasks"""
         try:
-            inspect = self.celery.control.inspect()
-            scheduled = inspect.scheduled()
+            # Shares the job runner's cached inspection; None when no worker replied
+            scheduled = self.job_runner.inspect_workers()['scheduled'] or {}
             
             tasks = []
             for worker, worker_tasks in scheduled.items():